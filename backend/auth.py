@@ -1,12 +1,17 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import time
 import jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from .cache import TTLCache
 from .config import settings
 from .database import get_db
+from .hashing import HashingExecutor, HashingOverloaded
+from .metrics import password_hash_duration, password_hash_queue_depth, password_hash_rejected, register_cache
 from .models import UserResponse
+from .profiling import span
 
 # Password Hashing
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -17,6 +22,42 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# Hashing is CPU-bound; request handlers must use the async variants below so
+# that a burst of logins degrades to 503s instead of stalling the event loop.
+hashing_executor = HashingExecutor(
+    max_workers=settings.HASH_MAX_WORKERS,
+    max_queue=settings.HASH_MAX_QUEUE
+)
+
+password_hash_queue_depth.set_function(lambda: {(): hashing_executor.pending})
+
+def _timed_hashing(operation, fn):
+    # Runs on the hashing worker, so queueing time is not included
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            password_hash_duration.observe(time.perf_counter() - start, operation)
+    return run
+
+async def _run_hashing(operation, fn, *args):
+    try:
+        return await hashing_executor.run(_timed_hashing(operation, fn), *args)
+    except HashingOverloaded:
+        password_hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_hashing("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_hashing("hash", get_password_hash, password)
+
 # JWT Token
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -31,8 +72,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=ALGORITHM)
     return encoded_jwt
 
+def user_token_claims(user: UserResponse) -> dict:
+    # "sub" identifies the user; "uid" and "name" let claims-only mode
+    # rebuild the UserResponse without touching the database.
+    return {"sub": user.email, "uid": str(user.id), "name": user.name}
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Current-user cache, keyed on the token subject (email)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+register_cache("users", user_cache)
+
+def invalidate_cached_user(email: str):
+    # Call whenever a user document changes (profile update, deletion, ...)
+    user_cache.invalidate(email)
+
+def clear_user_cache():
+    user_cache.clear()
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,15 +100,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+        with span("jwt_decode"):
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except jwt.PyJWTError:
         raise credentials_exception
-    
-    user = await db.users.find_one({"email": email})
+
+    if settings.AUTH_CLAIMS_ONLY and payload.get("uid") and payload.get("name"):
+        return UserResponse(id=payload["uid"], email=email, name=payload["name"])
+
+    cached_user = user_cache.get(email)
+    if cached_user is not None:
+        return cached_user
+
+    with span("user_lookup"):
+        user = await db.users.find_one({"email": email})
     if user is None:
         raise credentials_exception
-    
-    return UserResponse(**user)
\ No newline at end of file
+
+    with span("user_validate"):
+        user_response = UserResponse(**user)
+    user_cache.set(email, user_response)
+    return user_response
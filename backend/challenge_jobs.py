@@ -0,0 +1,136 @@
+"""
+Batch pre-generation of weekly challenges for every user with goals.
+
+Meant to run from a scheduler early on Monday (see render.yaml) so that
+``GET /challenges`` finds the week already generated instead of every user
+generating it on their first page load:
+
+    python -m backend.challenge_jobs [--week 2025-01-06] [--chunk-size 500] [--restart]
+
+Progress is checkpointed per chunk in ``job_checkpoints``; an interrupted run
+resumes after the last completed user. Users who already have challenges for
+the week (generated lazily, or by an earlier run) are skipped, like
+``GET /challenges`` does, and writes are idempotent upserts on the unique
+challenge key, so overlapping with live requests is safe.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from .rollups import week_start_of
+from .routers.external import generate_challenges_for_virtues, store_challenges
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_COLLECTION = "job_checkpoints"
+
+def latest_goals_pipeline(after_user_id: Optional[str] = None):
+    # Walks the goals(user_id, _id desc) index and keeps each user's newest goal
+    pipeline = [
+        {"$sort": {"user_id": 1, "_id": -1}},
+        {"$group": {"_id": "$user_id", "priority_virtues": {"$first": "$priority_virtues"}}},
+        {"$sort": {"_id": 1}},
+    ]
+    if after_user_id is not None:
+        pipeline.insert(0, {"$match": {"user_id": {"$gt": after_user_id}}})
+    return pipeline
+
+async def pregenerate_weekly_challenges(
+    db,
+    week_start: Optional[datetime] = None,
+    chunk_size: int = 500,
+    restart: bool = False
+) -> Dict[str, Any]:
+    week_start = week_start_of(week_start or datetime.now(timezone.utc))
+    job_id = f"weekly_challenges:{week_start.date().isoformat()}"
+    checkpoints = db[CHECKPOINTS_COLLECTION]
+
+    checkpoint = None if restart else await checkpoints.find_one({"_id": job_id})
+    if checkpoint and checkpoint.get("completed_at"):
+        logger.info("%s already completed at %s", job_id, checkpoint["completed_at"])
+        return {"job_id": job_id, "users": 0, "skipped": 0, "challenges": 0, "seconds": 0.0, "users_per_second": 0.0}
+
+    last_user_id = checkpoint.get("last_user_id") if checkpoint else None
+    processed = checkpoint.get("users", 0) if checkpoint else 0
+    if last_user_id:
+        logger.info("Resuming %s after user %s (%d users done)", job_id, last_user_id, processed)
+
+    started = time.perf_counter()
+    users = 0
+    skipped = 0
+    challenges = 0
+    chunk = []
+
+    async def flush():
+        nonlocal users, skipped, challenges, last_user_id, chunk
+        # A goal changed since the week was generated would otherwise add a
+        # second set of challenges next to the existing one
+        generated = set(await db.challenges.distinct(
+            "user_id", {"user_id": {"$in": [user_id for user_id, _ in chunk]}, "week_start": week_start}
+        ))
+        skipped += len(generated)
+        docs = [
+            doc
+            for user_id, virtues in chunk
+            if user_id not in generated
+            for doc in generate_challenges_for_virtues(virtues, user_id, week_start)
+        ]
+        if docs:
+            await store_challenges(db, docs)
+        users += len(chunk)
+        challenges += len(docs)
+        last_user_id = chunk[-1][0]
+        chunk = []
+        await checkpoints.update_one(
+            {"_id": job_id},
+            {"$set": {"last_user_id": last_user_id, "users": processed + users, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        elapsed = time.perf_counter() - started
+        logger.info("%s: %d users, %d challenges, %.0f users/s", job_id, users, challenges, users / elapsed)
+
+    cursor = db.goals.aggregate(latest_goals_pipeline(last_user_id), allowDiskUse=True)
+    async for goal in cursor:
+        chunk.append((goal["_id"], goal.get("priority_virtues") or []))
+        if len(chunk) >= chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+
+    await checkpoints.update_one(
+        {"_id": job_id},
+        {"$set": {"completed_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+    elapsed = time.perf_counter() - started
+    return {
+        "job_id": job_id,
+        "users": users,
+        "skipped": skipped,
+        "challenges": challenges,
+        "seconds": round(elapsed, 3),
+        "users_per_second": round(users / elapsed, 1) if elapsed else 0.0,
+    }
+
+async def _main(args) -> None:
+    from .database import connect
+
+    db = connect()
+    week = datetime.fromisoformat(args.week) if args.week else None
+    stats = await pregenerate_weekly_challenges(db, week, args.chunk_size, args.restart)
+    print(
+        f"{stats['job_id']}: {stats['users']} users ({stats['skipped']} already generated), {stats['challenges']} challenges "
+        f"in {stats['seconds']}s ({stats['users_per_second']} users/s)"
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    parser = argparse.ArgumentParser(description="Pre-generate weekly challenges for all users.")
+    parser.add_argument("--week", help="Any date in the target week (defaults to the current week)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint for this week")
+    asyncio.run(_main(parser.parse_args()))
@@ -1,11 +1,91 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
-    MONGODB_URI: str
+    # "memory" keeps all data in-process (see backend/memory_store.py), for
+    # running and profiling the API without a MongoDB server
+    STORAGE_BACKEND: Literal["mongo", "memory"] = "mongo"
+    # Required with the mongo backend
+    MONGODB_URI: Optional[str] = None
+    # Connection pool; MONGO_MIN_POOL_SIZE connections are opened before the
+    # app starts serving and kept open
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_IDLE_SECONDS: Optional[float] = 300.0
+    MONGO_WAIT_QUEUE_TIMEOUT_SECONDS: Optional[float] = None
+    # Wire compression, e.g. "zstd,snappy,zlib" (zstd and snappy need the
+    # zstandard / python-snappy packages)
+    MONGO_COMPRESSORS: Optional[str] = None
+    # Used by read-only routes that tolerate replication lag
+    MONGO_READ_PREFERENCE: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
     JWT_SECRET: str
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:5137"
 
+    # Authenticated user lookup cache (keyed on the token subject)
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Build the current user from signed token claims without a DB lookup
+    AUTH_CLAIMS_ONLY: bool = False
+
+    # Password hashing pool (defaults to one thread per CPU)
+    HASH_MAX_WORKERS: Optional[int] = None
+    HASH_MAX_QUEUE: int = 32
+
+    # When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN: Optional[str] = None
+
+    # Per-request profiling (see backend/profiling.py): requests carrying
+    # "X-Profile-Token: <PROFILING_TOKEN>" or picked by the sample rate get a
+    # Server-Timing breakdown; collapsed stacks go to PROFILING_OUTPUT_DIR.
+    # While a request is sampled for PROFILING_OUTPUT_DIR the whole worker
+    # runs with a 0.25ms GIL switch interval, slowing its other requests too,
+    # so keep the sample rate low when the output dir is set
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_OUTPUT_DIR: Optional[str] = None
+
+    # Log MongoDB commands slower than this (unset or 0 disables) and explain
+    # slow find/aggregate commands, once per query shape per interval
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300.0
+
+    # Write-behind for POST /moments (see backend/write_behind.py): moments are
+    # acknowledged once queued and inserted in batches of up to BATCH_SIZE,
+    # at most MAX_DELAY after the first one was queued
+    MOMENT_WRITE_BEHIND: bool = False
+    MOMENT_WRITE_BEHIND_BATCH_SIZE: int = 200
+    MOMENT_WRITE_BEHIND_MAX_DELAY_SECONDS: float = 0.05
+    MOMENT_WRITE_BEHIND_MAX_PENDING: int = 10000
+    MOMENT_WRITE_BEHIND_MAX_WAIT_SECONDS: float = 1.0
+
+    # POST /moments/bulk: items accepted per request, and items validated and
+    # inserted per batch. A JSON array is parsed whole, so its body is capped;
+    # NDJSON is streamed and only each line is
+    MOMENT_IMPORT_MAX_ITEMS: int = 100000
+    MOMENT_IMPORT_CHUNK_SIZE: int = 1000
+    MOMENT_IMPORT_MAX_JSON_BYTES: int = 32 * 1024 * 1024
+    MOMENT_IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+
+    # Create missing indexes from backend/indexes.py when the app starts
+    CREATE_INDEXES_ON_STARTUP: bool = True
+
+    # How often the news search index picks up changed articles
+    NEWS_INDEX_REFRESH_SECONDS: float = 300.0
+    # Per-user virtue profile used for personalized news ranking
+    PROFILE_CACHE_TTL_SECONDS: float = 600.0
+    PROFILE_CACHE_MAX_SIZE: int = 10000
+
+    # Latest goal and assessment per user (see backend/latest_documents.py)
+    LATEST_DOC_CACHE_TTL_SECONDS: float = 300.0
+    LATEST_DOC_CACHE_MAX_SIZE: int = 20000
+    # How uvicorn workers tell each other about goal/assessment writes:
+    # "local" for a single worker, "mongo" to broadcast through a capped collection
+    CACHE_INVALIDATION_BUS: Literal["local", "mongo"] = "local"
+
     class Config:
         # Check for .env in backend folder first, then parent directory
         # Pydantic-settings will use the first file that exists
@@ -1,13 +1,106 @@
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from .config import settings
+from .metrics import command_listener, pool_listener, mongo_pool_connections
+from . import profiling
+from .slow_queries import slow_query_listener
+from .memory_store import MemoryClient
 import certifi
-import ssl
 
-# Create SSL context using certifi
-ca = certifi.where()
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
 
-client = AsyncIOMotorClient(settings.MONGODB_URI, tlsCAFile=ca)
-db = client.get_default_database()
+# Set by connect(): the app calls it from its lifespan, so every uvicorn
+# worker builds its own client after it has been forked; CLI tools and
+# scripts call it directly
+client = None
+db = None
+# db with MONGO_READ_PREFERENCE, for read-only routes that tolerate
+# replication lag
+read_db = None
+
+def create_client():
+    if settings.STORAGE_BACKEND == "memory":
+        # Process-local and empty on every start; no command events, so the
+        # MongoDB metrics, profiling spans and slow query log stay quiet
+        return MemoryClient(default_database="innovation_character")
+
+    if not settings.MONGODB_URI:
+        raise RuntimeError("MONGODB_URI is required unless STORAGE_BACKEND=memory")
+
+    options = {}
+    if settings.MONGO_MAX_IDLE_SECONDS is not None:
+        options["maxIdleTimeMS"] = int(settings.MONGO_MAX_IDLE_SECONDS * 1000)
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_SECONDS is not None:
+        options["waitQueueTimeoutMS"] = int(settings.MONGO_WAIT_QUEUE_TIMEOUT_SECONDS * 1000)
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+
+    # tz_aware so datetimes read back match the UTC-aware ones we write
+    motor_client = AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        tlsCAFile=certifi.where(),
+        tz_aware=True,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        event_listeners=[command_listener, pool_listener, profiling.command_listener, slow_query_listener],
+        **options
+    )
+    slow_query_listener.attach(motor_client.delegate)
+    return motor_client
+
+def connect():
+    """Creates the client on first use and returns the default database."""
+    global client, db, read_db
+    if client is None:
+        client = create_client()
+        db = client.get_default_database()
+        read_db = db.with_options(read_preference=READ_PREFERENCES[settings.MONGO_READ_PREFERENCE]())
+    return db
+
+async def warm_up(connections: int) -> int:
+    """
+    Opens up to ``connections`` pooled connections (TLS handshake and auth
+    included) with concurrent pings, so the first requests after a deploy do
+    not pay for them. Returns the number of open connections afterwards.
+    """
+    connect()
+    if settings.STORAGE_BACKEND == "memory":
+        return 0
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(1, connections))))
+    return int(sum(mongo_pool_connections.values().values()))
+
+def close() -> None:
+    global client, db, read_db
+    if client is not None:
+        client.close()
+    client = db = read_db = None
 
 async def get_db():
-    return db
\ No newline at end of file
+    return db if db is not None else connect()
+
+async def get_read_db():
+    if read_db is None:
+        connect()
+    return read_db
+
+async def insert_document(collection, document: dict) -> dict:
+    # Returns the inserted document with its new _id, sparing the usual
+    # find_one round trip that would read it straight back.
+    result = await collection.insert_one(document)
+    document["_id"] = result.inserted_id
+    return document
+
+async def insert_documents(collection, documents: list) -> list:
+    if not documents:
+        return documents
+    result = await collection.insert_many(documents)
+    for document, inserted_id in zip(documents, result.inserted_ids):
+        document["_id"] = inserted_id
+    return documents
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full and the request should be shed."""
+
+class HashingExecutor:
+    """
+    Runs CPU-bound password hashing on a dedicated thread pool so that argon2
+    never blocks the event loop. argon2-cffi releases the GIL while hashing,
+    so ``max_workers`` threads hash in parallel. At most ``max_queue`` calls
+    may wait for a free worker; beyond that callers get ``HashingOverloaded``
+    immediately instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = 32):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_workers + self.max_queue:
+            raise HashingOverloaded()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,121 @@
+"""
+Declarative index registry for every collection the API queries.
+
+Indexes are applied at application startup (see ``backend.main``) and can be
+checked or applied without booting the server:
+
+    python -m backend.indexes check
+    python -m backend.indexes apply
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "moments": [
+        # GET /moments pages on (timestamp, _id); the reflection scans by date
+        IndexModel(
+            [("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="user_timestamp"
+        ),
+    ],
+    "assessments": [
+        # Latest assessment per user
+        IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)], name="user_latest"),
+    ],
+    "goals": [
+        # Latest goal per user
+        IndexModel([("user_id", ASCENDING), ("_id", DESCENDING)], name="user_latest"),
+    ],
+    "challenges": [
+        # Doubles as the (user_id, week_start) lookup index and makes
+        # challenge generation idempotent
+        IndexModel(
+            [("user_id", ASCENDING), ("week_start", ASCENDING),
+             ("virtueId", ASCENDING), ("title", ASCENDING)],
+            name="user_week_challenge_unique", unique=True
+        ),
+    ],
+    "articles": [
+        # Incremental refresh of the news search index
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "virtue_weekly_rollups": [
+        IndexModel(
+            [("user_id", ASCENDING), ("week_start", ASCENDING)],
+            name="user_week_unique", unique=True
+        ),
+    ],
+}
+
+def _key_of(spec) -> tuple:
+    # Index specs come back as SON/dicts or lists of pairs depending on the source
+    items = spec.items() if hasattr(spec, "items") else spec
+    return tuple((field, int(direction)) for field, direction in items)
+
+async def index_report(db) -> Dict[str, Dict[str, List[str]]]:
+    """Compares the registry with the live indexes of every registered collection."""
+    report = {}
+    for collection_name, models in INDEXES.items():
+        existing = await db[collection_name].index_information()
+        existing_keys = {_key_of(info["key"]): name for name, info in existing.items()}
+        declared_keys = set()
+
+        missing = []
+        for model in models:
+            key = _key_of(model.document["key"])
+            declared_keys.add(key)
+            if key not in existing_keys:
+                missing.append(model.document["name"])
+
+        extra = [
+            name for key, name in existing_keys.items()
+            if name != "_id_" and key not in declared_keys
+        ]
+        report[collection_name] = {"missing": missing, "extra": extra}
+    return report
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Creates every registered index; existing indexes are left untouched."""
+    created = {}
+    for collection_name, models in INDEXES.items():
+        created[collection_name] = await db[collection_name].create_indexes(models)
+    return created
+
+def _print_report(report) -> bool:
+    in_sync = True
+    for collection_name, entry in report.items():
+        status = "ok"
+        if entry["missing"]:
+            status = "missing: " + ", ".join(entry["missing"])
+            in_sync = False
+        if entry["extra"]:
+            status += " (extra: " + ", ".join(entry["extra"]) + ")"
+        print(f"{collection_name:<12} {status}")
+    return in_sync
+
+async def _main(command: str) -> int:
+    from .database import connect
+
+    db = connect()
+    if command == "apply":
+        await ensure_indexes(db)
+    return 0 if _print_report(await index_report(db)) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or apply MongoDB indexes.")
+    parser.add_argument(
+        "command",
+        choices=["check", "apply"],
+        help="check: report and exit 1 if indexes are missing; apply: create missing indexes"
+    )
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
@@ -0,0 +1,204 @@
+"""
+Per-user cache of the latest goal and latest assessment.
+
+Nearly every page reads them and they change only when the user resubmits
+onboarding, so they are kept in a bounded in-process cache:
+
+* reads go through ``latest_documents.get(db, "goals", user_id)``; concurrent
+  misses for the same user share one query, and "no document yet" is cached
+  too;
+* ``POST /goals`` and ``POST /assessment`` write the new document through
+  with ``latest_documents.put`` and announce it on the invalidation bus;
+* the bus tells the other uvicorn workers to drop their copy. ``local`` (one
+  worker) does nothing; ``mongo`` broadcasts through a small capped
+  collection that every worker tails. Entries also expire after
+  ``LATEST_DOC_CACHE_TTL_SECONDS`` whatever happens to the bus.
+"""
+import asyncio
+import logging
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List, Optional
+
+import pymongo
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import cache_invalidations_published, cache_invalidations_received, register_cache
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+def approximate_size(value: Any) -> int:
+    """Deep sys.getsizeof of a BSON-like document."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + approximate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += approximate_size(item)
+    return size
+
+class InvalidationBus:
+    """
+    Carries "user X has a new goal/assessment" between workers. ``publish``
+    is called by the worker that did the write; every other worker's
+    ``on_message(kind, user_id)`` runs once the message reaches it.
+    """
+
+    async def start(self, db, on_message: Callable[[str, str], None]) -> None:
+        pass
+
+    async def publish(self, kind: str, user_id: str) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+class LocalInvalidationBus(InvalidationBus):
+    """A single worker has no one to tell."""
+
+class MongoInvalidationBus(InvalidationBus):
+    """
+    Broadcasts through a capped collection tailed by every worker, so it
+    needs nothing beyond the MongoDB deployment the app already uses.
+    Messages from this worker are skipped on the way back in. The collection
+    is set up by the tailing task, retrying until MongoDB is reachable, so
+    startup never waits on it; writes made before then are not announced
+    and reach the other workers when their entries expire.
+    """
+
+    # Re-opened tails look back this far, covering clock skew between hosts;
+    # seeing a message twice only costs a spurious miss
+    REPLAY_WINDOW = timedelta(seconds=5)
+
+    def __init__(self, collection_name: str = "cache_invalidations", size_bytes: int = 1 << 20):
+        self.collection_name = collection_name
+        self.size_bytes = size_bytes
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._db = None
+        # Set once the capped collection is known to exist; inserting into a
+        # missing one would create it uncapped
+        self._collection = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db, on_message):
+        self._db = db
+        self._task = asyncio.create_task(self._tail(on_message))
+
+    async def publish(self, kind, user_id):
+        if self._collection is None:
+            logger.warning("Invalidation bus not ready; %s write for %s not announced", kind, user_id)
+            return
+        await self._collection.insert_one({
+            "origin": self.origin,
+            "kind": kind,
+            "user_id": user_id,
+            "at": datetime.now(timezone.utc),
+        })
+        cache_invalidations_published.inc()
+
+    async def _create_collection(self):
+        try:
+            await self._db.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass  # Created by another worker
+        self._collection = self._db[self.collection_name]
+
+    async def _tail(self, on_message):
+        since = datetime.now(timezone.utc)
+        while True:
+            try:
+                if self._collection is None:
+                    await self._create_collection()
+                cursor = self._collection.find(
+                    {"at": {"$gte": since - self.REPLAY_WINDOW}},
+                    cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for message in cursor:
+                        since = max(since, message["at"])
+                        if message["origin"] != self.origin:
+                            cache_invalidations_received.inc()
+                            on_message(message["kind"], message["user_id"])
+                    # Nothing new yet, or the collection is still empty
+                    await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation tail failed; retrying")
+                await asyncio.sleep(5)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+
+class LatestDocumentCache:
+    def __init__(self, maxsize: int, ttl: float, bus: InvalidationBus):
+        self.bus = bus
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, sizeof=approximate_size)
+        self._loads = SingleFlight()
+        # Bumped by every write; a load that overlapped one may hold an
+        # older document and is not stored
+        self._epoch = 0
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    async def start(self, db) -> None:
+        await self.bus.start(db, self._on_remote_write)
+
+    async def stop(self) -> None:
+        await self.bus.stop()
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Called with (kind, user_id) when another worker writes a document."""
+        self._listeners.append(listener)
+
+    async def get(self, db, kind: str, user_id: str) -> Optional[dict]:
+        """The user's latest document of ``kind``. Callers must not mutate it."""
+        document = self._cache.get((kind, user_id), _MISSING)
+        if document is not _MISSING:
+            return document
+        return await self._loads.do((kind, user_id), lambda: self._load(db, kind, user_id))
+
+    async def _load(self, db, kind: str, user_id: str) -> Optional[dict]:
+        epoch = self._epoch
+        document = await db[kind].find_one({"user_id": user_id}, sort=[("_id", pymongo.DESCENDING)])
+        if epoch == self._epoch:
+            self._cache.set((kind, user_id), document)
+        return document
+
+    async def put(self, kind: str, user_id: str, document: dict) -> None:
+        """Write-through for a document just inserted as the user's latest."""
+        self._epoch += 1
+        self._cache.set((kind, user_id), document)
+        try:
+            await self.bus.publish(kind, user_id)
+        except Exception:
+            # The other workers catch up when their entry expires
+            logger.exception("Could not publish %s invalidation for %s", kind, user_id)
+
+    def _on_remote_write(self, kind: str, user_id: str) -> None:
+        self._epoch += 1
+        self._cache.invalidate((kind, user_id))
+        for listener in self._listeners:
+            listener(kind, user_id)
+
+def make_invalidation_bus() -> InvalidationBus:
+    # The memory backend lives inside one process, so there is nothing to share
+    if settings.CACHE_INVALIDATION_BUS == "mongo" and settings.STORAGE_BACKEND == "mongo":
+        return MongoInvalidationBus()
+    return LocalInvalidationBus()
+
+latest_documents = LatestDocumentCache(
+    maxsize=settings.LATEST_DOC_CACHE_MAX_SIZE,
+    ttl=settings.LATEST_DOC_CACHE_TTL_SECONDS,
+    bus=make_invalidation_bus()
+)
+register_cache("latest_documents", latest_documents._cache)
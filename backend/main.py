@@ -1,12 +1,73 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .database import client
+from fastapi.responses import PlainTextResponse
+from .database import connect, close, get_db, warm_up
 from .config import settings
+from .auth import hashing_executor
+from .indexes import ensure_indexes, index_report
+from .latest_documents import latest_documents
+from .metrics import MetricsMiddleware, registry, pool_stats
+from .profiling import ProfilingMiddleware
+from .slow_queries import slow_query_listener
+from .write_behind import moment_writer
 from pymongo.errors import ConnectionFailure
+import logging
 import os
 from .routers import auth, onboarding, moments, dashboard, external
+from .routers.external import refresh_news_index, keep_news_index_fresh
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A client per worker, with its pool opened before traffic arrives
+    db = connect()
+    try:
+        connections = await warm_up(settings.MONGO_MIN_POOL_SIZE)
+        logger.info("MongoDB pool warmed up with %d connections", connections)
+    except Exception:
+        # /healthz answers 503 until the database is reachable
+        logger.exception("MongoDB pool warm-up failed")
+
+    if settings.CREATE_INDEXES_ON_STARTUP:
+        try:
+            await ensure_indexes(db)
+            for collection_name, entry in (await index_report(db)).items():
+                if entry["missing"]:
+                    logger.warning("Missing indexes on %s: %s", collection_name, entry["missing"])
+                if entry["extra"]:
+                    logger.info("Unregistered indexes on %s: %s", collection_name, entry["extra"])
+        except Exception:
+            # Serving without indexes is slow but still correct
+            logger.exception("Index bootstrap failed")
+
+    news_synced_at = None
+    try:
+        news_synced_at = await refresh_news_index(db)
+    except Exception:
+        # Keep serving the bundled articles until a refresh succeeds
+        logger.exception("Initial news index load failed")
+    news_refresher = asyncio.create_task(
+        keep_news_index_fresh(db, settings.NEWS_INDEX_REFRESH_SECONDS, news_synced_at)
+    )
+    await latest_documents.start(db)
+    if moment_writer is not None:
+        await moment_writer.start(db)
+
+    yield
+
+    if moment_writer is not None:
+        # Before anything it writes with goes away
+        await moment_writer.close()
+    await latest_documents.stop()
+    news_refresher.cancel()
+    hashing_executor.shutdown()
+    slow_query_listener.shutdown()
+    close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(auth.router, prefix="/api/v1/auth")
 app.include_router(onboarding.router, prefix="/api/v1")
@@ -25,13 +86,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so it times everything including CORS handling
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/healthz")
 async def health_check():
     try:
         # Check database connection using the ping command
-        await client.admin.command('ping')
-        return {"status": "ok", "db": "connected"}
+        db = await get_db()
+        await db.command('ping')
+        return {"status": "ok", "db": "connected", "pool": pool_stats()}
     except Exception as e:
         # Log the error in a real app
         print(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Database not ready")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Database not ready")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
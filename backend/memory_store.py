@@ -0,0 +1,720 @@
+"""
+In-process, in-memory stand-in for the Motor client.
+
+Selected with ``STORAGE_BACKEND=memory``; ``backend.database`` then exposes a
+``MemoryClient`` instead of an ``AsyncIOMotorClient`` and every router,
+job and script runs unchanged with no MongoDB server. Data lives in this
+process only and is lost on restart, so it is meant for local development,
+tests and profiling the app's own CPU cost without network latency.
+
+Only what the routers, rollups, indexes, jobs and scripts call is
+implemented:
+
+* ``find`` (filter, inclusion projection; cursor ``sort``, ``limit``,
+  ``batch_size``), ``find_one`` (with ``sort``), ``count_documents``,
+  ``distinct`` and ``aggregate``;
+* ``insert_one``/``insert_many``, ``update_one``, ``find_one_and_update``,
+  ``delete_many`` and ``bulk_write`` of ``UpdateOne``, with upserts and
+  ``$set``, ``$setOnInsert`` and ``$inc``;
+* query operators ``$gt(e)``, ``$lt(e)``, ``$in``, ``$and`` and ``$or``;
+* pipeline stages ``$match``, ``$sort`` and ``$group`` (``$sum``,
+  ``$first``, ``$push``), with the date part operators the dashboards and
+  rollups use;
+* ``create_indexes`` and ``index_information``. Unique indexes are
+  enforced, and equality lookups on an index's leading field avoid scanning
+  the whole collection.
+
+Anything else raises ``NotImplementedError`` rather than silently returning
+different results than MongoDB would.
+
+Operations never await, so each one is atomic with respect to other requests
+on the event loop. Datetimes are stored the way a ``tz_aware`` client reads
+them back: UTC-aware, truncated to milliseconds.
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+MISSING = _Missing()
+
+# --- Values ---
+
+def _normalize(value: Any) -> Any:
+    """Deep copy of a value as it would round-trip through BSON."""
+    if isinstance(value, dict):
+        return {key: _normalize(inner) for key, inner in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(inner) for inner in value]
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        else:
+            value = value.astimezone(timezone.utc)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy(inner) for key, inner in value.items()}
+    if isinstance(value, list):
+        return [_copy(inner) for inner in value]
+    return value
+
+def _freeze(value: Any) -> Any:
+    """Hashable equivalent of a value, for grouping and unique keys."""
+    if isinstance(value, dict):
+        return ("dict", tuple((key, _freeze(inner)) for key, inner in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(inner) for inner in value))
+    if isinstance(value, bool):
+        return ("bool", value)
+    return value
+
+def _get_path(document: Any, path: str) -> Any:
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list):
+            # Dotted paths through arrays collect the field from every element
+            found = [_get_path(item, part) for item in value if isinstance(item, dict)]
+            found = [item for item in found if item is not MISSING]
+            value = found if found else MISSING
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+def _set_path(document: dict, path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+        if not isinstance(document, dict):
+            raise NotImplementedError(f"Cannot set {path!r} through a non-document value")
+    document[parts[-1]] = value
+
+# BSON comparison order between types
+def _type_rank(value: Any) -> int:
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+def _sort_value(value: Any) -> Tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank == 1:
+        return (1, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    if rank == 7:
+        return (rank, value.binary)
+    return (rank, value)
+
+def _sort_spec(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return [(key, int(value)) for key, value in key_or_list.items()]
+    return [(key, int(value)) for key, value in key_or_list]
+
+def _sort_documents(documents: List[dict], spec: List[Tuple[str, int]]) -> List[dict]:
+    # Stable sorts from the least significant key up give a compound ordering
+    for field, direction in reversed(spec):
+        documents.sort(key=lambda doc: _sort_value(_get_path(doc, field)), reverse=direction < 0)
+    return documents
+
+# --- Queries ---
+
+def _equals(value: Any, target: Any) -> bool:
+    if value is MISSING:
+        return target is None
+    if isinstance(value, list) and not isinstance(target, list):
+        return any(_equals(item, target) for item in value)
+    if isinstance(value, bool) != isinstance(target, bool):
+        return False
+    return value == target
+
+def _compare(value: Any, target: Any, op: str) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    for candidate in candidates:
+        if candidate is MISSING:
+            candidate = None
+        if _type_rank(candidate) != _type_rank(target):
+            continue
+        if candidate is None:
+            if op in ("$gte", "$lte"):
+                return True
+            continue
+        left, right = _sort_value(candidate)[1], _sort_value(target)[1]
+        if (op == "$gt" and left > right) or (op == "$gte" and left >= right) \
+                or (op == "$lt" and left < right) or (op == "$lte" and left <= right):
+            return True
+    return False
+
+def _is_operator_document(condition: Any) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(key.startswith("$") for key in condition)
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not _is_operator_document(condition):
+        return _equals(value, condition)
+    for op, argument in condition.items():
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            matched = _compare(value, argument, op)
+        elif op == "$in":
+            matched = any(_equals(value, item) for item in argument)
+        else:
+            raise NotImplementedError(f"Query operator {op} is not supported by the in-memory backend")
+        if not matched:
+            return False
+    return True
+
+def _matches(document: dict, query: Optional[dict]) -> bool:
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(document, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, sub) for sub in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Query operator {key} is not supported by the in-memory backend")
+        elif not _matches_condition(_get_path(document, key), condition):
+            return False
+    return True
+
+def _equality_conditions(query: Optional[dict]) -> Iterable[Tuple[str, List[Any]]]:
+    """(field, possible values) pairs every matching document must satisfy."""
+    if not query:
+        return
+    for key, condition in query.items():
+        if key == "$and":
+            for sub in condition:
+                yield from _equality_conditions(sub)
+        elif key.startswith("$"):
+            continue
+        elif _is_operator_document(condition):
+            if "$in" in condition:
+                yield key, list(condition["$in"])
+        else:
+            yield key, [condition]
+
+def _project(document: dict, projection: Any) -> dict:
+    if not projection:
+        return document
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if not fields or not all(bool(value) for value in fields.values()):
+        raise NotImplementedError("Only inclusion projections are supported by the in-memory backend")
+    projected = {}
+    if include_id and "_id" in document:
+        projected["_id"] = document["_id"]
+    for field in fields:
+        value = _get_path(document, field)
+        if value is not MISSING:
+            _set_path(projected, field, value)
+    return projected
+
+# --- Updates ---
+
+def _upsert_seed(query: Optional[dict]) -> dict:
+    seed: dict = {}
+    for field, values in _equality_conditions(query):
+        if len(values) == 1 and not _is_operator_document(values[0]):
+            _set_path(seed, field, _normalize(values[0]))
+    return seed
+
+def _apply_update(document: dict, update: dict, inserting: bool) -> dict:
+    if not _is_operator_document(update):
+        raise NotImplementedError("Replacement updates are not supported by the in-memory backend")
+
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, argument in fields.items():
+            argument = _normalize(argument)
+            current = _get_path(document, path)
+            if op in ("$set", "$setOnInsert"):
+                _set_path(document, path, argument)
+            elif op == "$inc":
+                _set_path(document, path, (0 if current is MISSING else current) + argument)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the in-memory backend")
+    return document
+
+# --- Aggregation expressions ---
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo is None else value.astimezone(timezone.utc)
+
+DATE_PARTS = {
+    # 1 (Sunday) .. 7 (Saturday)
+    "$dayOfWeek": lambda d: (d.weekday() + 1) % 7 + 1,
+    "$hour": lambda d: d.hour,
+    "$isoWeek": lambda d: d.isocalendar()[1],
+    "$isoWeekYear": lambda d: d.isocalendar()[0],
+}
+
+def _evaluate(expression: Any, document: dict) -> Any:
+    if isinstance(expression, str) and expression.startswith("$") and not expression.startswith("$$"):
+        value = _get_path(document, expression[1:])
+        return None if value is MISSING else value
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) == 1:
+        op, argument = next(iter(expression.items()))
+        if op.startswith("$"):
+            return _evaluate_operator(op, argument, document)
+    return {key: _evaluate(inner, document) for key, inner in expression.items()}
+
+def _evaluate_operator(op: str, argument: Any, document: dict) -> Any:
+    if op in DATE_PARTS:
+        if isinstance(argument, dict) and "date" in argument:
+            if argument.get("timezone") not in (None, "UTC", "GMT"):
+                raise NotImplementedError("Date operators only support UTC in the in-memory backend")
+            argument = argument["date"]
+        value = _evaluate(argument, document)
+        return DATE_PARTS[op](_utc(value)) if isinstance(value, datetime) else None
+    raise NotImplementedError(f"Expression operator {op} is not supported by the in-memory backend")
+
+def _group(documents: List[dict], spec: dict) -> List[dict]:
+    accumulators = {field: next(iter(acc.items())) for field, acc in spec.items() if field != "_id"}
+    groups: "OrderedDict[Any, dict]" = OrderedDict()
+    for document in documents:
+        key = _evaluate(spec["_id"], document)
+        frozen = _freeze(key)
+        group = groups.get(frozen)
+        if group is None:
+            group = groups[frozen] = {"_id": key}
+        for field, (op, expression) in accumulators.items():
+            value = _evaluate(expression, document)
+            if op == "$sum":
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    group[field] = group.get(field, 0) + value
+                else:
+                    group.setdefault(field, 0)
+            elif op == "$first":
+                if field not in group:
+                    group[field] = value
+            elif op == "$push":
+                group.setdefault(field, []).append(value)
+            else:
+                raise NotImplementedError(f"Accumulator {op} is not supported by the in-memory backend")
+    return list(groups.values())
+
+# --- Cursors ---
+
+class MemoryCursor:
+    """Lazily evaluated result set supporting the Motor cursor calls we use."""
+
+    def __init__(self, load):
+        self._load = load
+        self._sort: List[Tuple[str, int]] = []
+        self._limit = 0
+        self._results: Optional[List[dict]] = None
+        self._position = 0
+
+    def sort(self, key_or_list, direction=None) -> "MemoryCursor":
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "MemoryCursor":
+        return self
+
+    def _evaluate(self) -> List[dict]:
+        if self._results is None:
+            self._results = self._load(self._sort, self._limit)
+        return self._results
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._evaluate()
+        end = len(results) if length is None else min(len(results), self._position + length)
+        batch = results[self._position:end]
+        self._position = end
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        results = self._evaluate()
+        if self._position >= len(results):
+            raise StopAsyncIteration
+        self._position += 1
+        return results[self._position - 1]
+
+# --- Collections ---
+
+class _Index:
+    def __init__(self, name: str, keys: List[Tuple[str, int]], unique: bool):
+        self.name = name
+        self.keys = keys
+        self.unique = unique
+        self.field = keys[0][0]
+        # leading field value -> {_id: None}, an insertion-ordered set
+        self.buckets: Dict[Any, Dict[Any, None]] = {}
+        # full key -> _id, for unique indexes
+        self.unique_keys: Dict[Any, Any] = {}
+
+    def _bucket_keys(self, document: dict) -> List[Any]:
+        value = _get_path(document, self.field)
+        if value is MISSING or value is None:
+            return [None]
+        values = value if isinstance(value, list) else [value]
+        return [_freeze(item) for item in values]
+
+    def unique_key(self, document: dict) -> Any:
+        return tuple(_freeze(None if (value := _get_path(document, field)) is MISSING else value) for field, _ in self.keys)
+
+    def add(self, document: dict) -> None:
+        for key in self._bucket_keys(document):
+            self.buckets.setdefault(key, {})[document["_id"]] = None
+        if self.unique:
+            self.unique_keys[self.unique_key(document)] = document["_id"]
+
+    def remove(self, document: dict) -> None:
+        for key in self._bucket_keys(document):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.pop(document["_id"], None)
+                if not bucket:
+                    del self.buckets[key]
+        if self.unique:
+            self.unique_keys.pop(self.unique_key(document), None)
+
+    def conflict(self, document: dict) -> bool:
+        if not self.unique:
+            return False
+        owner = self.unique_keys.get(self.unique_key(document), MISSING)
+        return owner is not MISSING and owner != document["_id"]
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        # _id -> document, in insertion (natural) order
+        self._documents: Dict[Any, dict] = {}
+        self._indexes: Dict[str, _Index] = {}
+
+    def __repr__(self):
+        return f"MemoryCollection({self.full_name!r})"
+
+    # --- Reads ---
+
+    def _scan(self, query: Optional[dict]) -> Iterable[dict]:
+        # Narrow to the smallest index bucket an equality condition allows
+        best: Optional[List[Any]] = None
+        for field, values in _equality_conditions(query):
+            if field == "_id":
+                ids = [value for value in values if not _is_operator_document(value)]
+            else:
+                index = next((index for index in self._indexes.values() if index.field == field), None)
+                if index is None or any(isinstance(value, dict) for value in values):
+                    continue
+                ids = []
+                for value in values:
+                    bucket_keys = [_freeze(item) for item in value] if isinstance(value, list) else [_freeze(value)]
+                    for key in bucket_keys:
+                        ids.extend(index.buckets.get(key, ()))
+            if best is None or len(ids) < len(best):
+                best = ids
+        if best is None:
+            candidates: Iterable[dict] = list(self._documents.values())
+        else:
+            candidates = [self._documents[_id] for _id in dict.fromkeys(best) if _id in self._documents]
+        return [document for document in candidates if _matches(document, query)]
+
+    def _select(self, query, sort=None, limit=0) -> List[dict]:
+        documents = self._scan(_normalize(query) if query else None)
+        if sort:
+            documents = _sort_documents(list(documents), sort)
+        if limit:
+            documents = documents[:abs(limit)]
+        return documents
+
+    def find(self, filter=None, projection=None, **kwargs) -> MemoryCursor:
+        def load(cursor_sort, cursor_limit):
+            documents = self._select(filter, cursor_sort, cursor_limit)
+            return [_project(_copy(document), projection) for document in documents]
+
+        return MemoryCursor(load)
+
+    async def find_one(self, filter=None, sort=None, **kwargs) -> Optional[dict]:
+        documents = self._select(filter, _sort_spec(sort), 1)
+        return _copy(documents[0]) if documents else None
+
+    async def count_documents(self, filter, **kwargs) -> int:
+        return len(self._select(filter))
+
+    async def distinct(self, key, filter=None, **kwargs) -> List[Any]:
+        values: "OrderedDict[Any, Any]" = OrderedDict()
+        for document in self._select(filter):
+            value = _get_path(document, key)
+            for item in (value if isinstance(value, list) else [value]):
+                if item is not MISSING:
+                    values.setdefault(_freeze(item), _copy(item))
+        return list(values.values())
+
+    def aggregate(self, pipeline: List[dict], **kwargs) -> MemoryCursor:
+        def load(cursor_sort, cursor_limit):
+            stages = list(pipeline)
+            if stages and "$match" in stages[0]:
+                documents = [_copy(document) for document in self._select(stages.pop(0)["$match"])]
+            else:
+                documents = [_copy(document) for document in self._documents.values()]
+            for stage in stages:
+                (name, spec), = stage.items()
+                if name == "$match":
+                    spec = _normalize(spec)
+                    documents = [document for document in documents if _matches(document, spec)]
+                elif name == "$sort":
+                    documents = _sort_documents(documents, _sort_spec(spec))
+                elif name == "$group":
+                    documents = _group(documents, spec)
+                else:
+                    raise NotImplementedError(f"Pipeline stage {name} is not supported by the in-memory backend")
+            return documents
+
+        return MemoryCursor(load)
+
+    # --- Writes ---
+
+    def _check_unique(self, document: dict) -> None:
+        for index in self._indexes.values():
+            if index.conflict(document):
+                key = {field: _get_path(document, field) for field, _ in index.keys}
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name} dup key: {key}",
+                    11000,
+                    {"code": 11000, "keyPattern": dict(index.keys), "keyValue": key},
+                )
+
+    def _store(self, document: dict) -> None:
+        if document["_id"] in self._documents:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.full_name} index: _id_ dup key: {{ _id: {document['_id']!r} }}",
+                11000,
+                {"code": 11000, "keyPattern": {"_id": 1}, "keyValue": {"_id": document["_id"]}},
+            )
+        self._check_unique(document)
+        self._documents[document["_id"]] = document
+        for index in self._indexes.values():
+            index.add(document)
+
+    def _insert(self, document: dict) -> Any:
+        # Like the driver, the caller's document gains its _id
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        self._store(_normalize(document))
+        return document["_id"]
+
+    def _replace(self, old: dict, new: dict) -> None:
+        if new.get("_id", old["_id"]) != old["_id"]:
+            raise NotImplementedError("Updating _id is not supported")
+        new["_id"] = old["_id"]
+        for index in self._indexes.values():
+            index.remove(old)
+        try:
+            self._check_unique(new)
+        except DuplicateKeyError:
+            for index in self._indexes.values():
+                index.add(old)
+            raise
+        self._documents[old["_id"]] = new
+        for index in self._indexes.values():
+            index.add(new)
+
+    def _update(self, filter, update, upsert=False) -> Tuple[Dict[str, Any], Optional[dict], Optional[dict]]:
+        """Returns the raw result plus the document before and after."""
+        targets = self._select(filter, limit=1)
+        if not targets:
+            if not upsert:
+                return {"n": 0, "nModified": 0, "ok": 1.0}, None, None
+            document = _apply_update(_upsert_seed(filter), update, inserting=True)
+            document.setdefault("_id", ObjectId())
+            self._store(document)
+            return {"n": 1, "nModified": 0, "upserted": document["_id"], "ok": 1.0}, None, document
+
+        old = targets[0]
+        new = _apply_update(_copy(old), update, inserting=False)
+        modified = int(new != old)
+        if modified:
+            self._replace(old, new)
+        return {"n": 1, "nModified": modified, "ok": 1.0}, old, new
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        return InsertOneResult(self._insert(document), True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        documents = list(documents)
+        inserted_ids = []
+        errors = []
+        for position, document in enumerate(documents):
+            try:
+                inserted_ids.append(self._insert(document))
+            except DuplicateKeyError as e:
+                errors.append({"index": position, "code": 11000, "errmsg": str(e), "op": document})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted_ids),
+                "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+            })
+        return InsertManyResult(inserted_ids, True)
+
+    async def update_one(self, filter, update, upsert=False, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert)[0], True)
+
+    async def find_one_and_update(self, filter, update, projection=None, upsert=False, return_document=False, **kwargs) -> Optional[dict]:
+        _, before, after = self._update(filter, update, upsert)
+        # ReturnDocument.AFTER is True
+        document = after if return_document else before
+        return _project(_copy(document), projection) if document is not None else None
+
+    def _delete(self, document: dict) -> None:
+        del self._documents[document["_id"]]
+        for index in self._indexes.values():
+            index.remove(document)
+
+    async def delete_many(self, filter, **kwargs) -> DeleteResult:
+        documents = self._select(filter)
+        for document in documents:
+            self._delete(document)
+        return DeleteResult({"n": len(documents), "ok": 1.0}, True)
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        result = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+        }
+        for position, request in enumerate(requests):
+            if not isinstance(request, UpdateOne):
+                raise NotImplementedError(f"{type(request).__name__} is not supported by the in-memory backend")
+            try:
+                raw, _, _ = self._update(request._filter, request._doc, bool(request._upsert))
+                if "upserted" in raw:
+                    result["nUpserted"] += 1
+                    result["upserted"].append({"index": position, "_id": raw["upserted"]})
+                else:
+                    result["nMatched"] += raw["n"]
+                    result["nModified"] += raw["nModified"]
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index": position, "code": 11000, "errmsg": str(e), "op": request})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    # --- Indexes ---
+
+    def _create_index(self, keys: List[Tuple[str, int]], name: str, unique: bool) -> str:
+        if name in self._indexes:
+            return name
+        index = _Index(name, keys, unique)
+        for document in self._documents.values():
+            if index.conflict(document):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {name}", 11000)
+            index.add(document)
+        self._indexes[name] = index
+        return name
+
+    async def create_indexes(self, indexes, **kwargs) -> List[str]:
+        names = []
+        for model in indexes:
+            document = model.document
+            keys = list(document["key"].items())
+            name = document.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+            names.append(self._create_index(keys, name, document.get("unique", False)))
+        return names
+
+    async def index_information(self) -> Dict[str, Dict[str, Any]]:
+        information = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            information[name] = {"v": 2, "key": list(index.keys)}
+            if index.unique:
+                information[name]["unique"] = True
+        return information
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self, name)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def with_options(self, **kwargs) -> "MemoryDatabase":
+        # Read preferences and write concerns mean nothing in one process
+        return self
+
+    async def command(self, command, value=1, **kwargs) -> Dict[str, Any]:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise NotImplementedError(f"Command {name} is not supported by the in-memory backend")
+
+class MemoryClient:
+    def __init__(self, default_database: str = "memory"):
+        self._default = default_database
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(self, name)
+        return database
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_default_database(self, default: Optional[str] = None, **kwargs) -> MemoryDatabase:
+        return self[self._default or default]
+
+    def close(self) -> None:
+        self._databases.clear()
@@ -0,0 +1,475 @@
+"""
+Low-overhead in-process metrics rendered in the Prometheus text format.
+
+Observations never take a lock: every thread writes into its own shard
+(the event loop thread for HTTP metrics, Motor's executor threads for MongoDB
+command and pool events) and shards are only summed when ``/metrics`` is
+scraped. Recording an observation is a dict lookup, a bisect over the bucket
+bounds and three list increments.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+class _Sharded:
+    """Per-thread values created by ``factory`` and merged on read."""
+
+    def __init__(self, factory: Callable[[], dict]):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._factory()
+            # Only taken once per thread, when its shard is created
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def shards(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _format_labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """
+    Counter summed from per-thread shards. ``set_function`` instead reads
+    totals something else already keeps (they must only ever go up).
+    """
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = _Sharded(dict)
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._values.local()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._function = function
+
+    def totals(self) -> Dict[LabelValues, float]:
+        if self._function is not None:
+            return self._function()
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._values.shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def samples(self):
+        return [f"{self.name}{self._format_labels(k)} {v}" for k, v in sorted(self.totals().items())]
+
+class Gauge(Metric):
+    """
+    Gauge whose value is the sum of per-thread deltas, so ``inc``/``dec`` may
+    be called from any thread. ``set_function`` makes it computed at scrape time.
+    """
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = _Sharded(dict)
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._values.local()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._function = function
+
+    def values(self) -> Dict[LabelValues, float]:
+        if self._function is not None:
+            return self._function()
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._values.shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def samples(self):
+        return [f"{self.name}{self._format_labels(k)} {v}" for k, v in sorted(self.values().items())]
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last)..., sum, count]
+        self._values = _Sharded(dict)
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._values.local()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self) -> Dict[LabelValues, List[float]]:
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in self._values.shards():
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return merged
+
+    def samples(self):
+        lines = []
+        for labels, series in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{self._format_labels(labels)} {series[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+registry = Registry()
+
+# --- HTTP ---
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ("method",)
+))
+
+def route_template(scope) -> str:
+    """
+    The matched route as a template (/challenges/{challenge_id}), rebuilt
+    from the request path and its path parameters so it works whatever way
+    the router nests included routers. Unmatched paths share one label to
+    keep cardinality bounded.
+    """
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    path = scope["path"]
+    path_params = scope.get("path_params")
+    if path_params:
+        for name, value in path_params.items():
+            segment = "/" + str(value)
+            index = path.rfind(segment)
+            end = index + len(segment)
+            if index != -1 and (end == len(path) or path[end] == "/"):
+                path = path[:index] + "/{" + name + "}" + path[end:]
+    return path
+
+# The ASGI scope of the request being handled, so MongoDB listeners (which
+# see a copy of the request's context) can tell which route issued a command
+current_request_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+# Only touched from the event loop thread, so plain dict updates suffice
+_in_flight: Dict[str, int] = {}
+http_requests_in_flight.set_function(lambda: {(m,): float(n) for m, n in _in_flight.items()})
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        # The route template is only known once routing has run, so the
+        # in-flight gauge is labelled by method alone
+        _in_flight[method] = _in_flight.get(method, 0) + 1
+        token = current_request_scope.set(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_scope.reset(token)
+            _in_flight[method] -= 1
+            http_request_duration.observe(time.perf_counter() - start, method, route_template(scope), status)
+
+# --- MongoDB ---
+
+mongo_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command.",
+    ("collection", "command", "outcome")
+))
+mongo_pool_connections = registry.register(Gauge(
+    "mongodb_pool_connections",
+    "Open pooled MongoDB connections by server.",
+    ("address",)
+))
+mongo_pool_checked_out = registry.register(Gauge(
+    "mongodb_pool_checked_out_connections",
+    "MongoDB connections currently checked out by server.",
+    ("address",)
+))
+mongo_pool_checkout_wait = registry.register(Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    ("address",),
+    # Checkouts from a warm pool take microseconds
+    buckets=(0.0001, 0.00025, 0.0005) + LATENCY_BUCKETS
+))
+mongo_pool_checkout_failures = registry.register(Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Failed connection checkouts by server and reason.",
+    ("address", "reason")
+))
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        # (connection, request_id) -> collection, filled in by started()
+        self._collections: Dict[tuple, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def _record(self, event, outcome):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name, outcome)
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc(_address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(_address(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_checkout_failures.inc(_address(event), str(event.reason))
+
+    def connection_checked_out(self, event):
+        mongo_pool_checked_out.inc(_address(event))
+        mongo_pool_checkout_wait.observe(event.duration, _address(event))
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec(_address(event))
+
+command_listener = CommandMetricsListener()
+pool_listener = PoolMetricsListener()
+
+def _bucket_percentile_ms(buckets, series, pct: float) -> Optional[float]:
+    # Upper bound of the bucket holding the pct-th observation; None when it
+    # is past the largest bucket
+    target = series[-1] * pct / 100
+    cumulative = 0
+    for bound, count in zip(buckets, series):
+        cumulative += count
+        if cumulative >= target:
+            return round(bound * 1000, 3)
+    return None
+
+def pool_stats() -> Dict[str, dict]:
+    """Per-server pool usage and checkout wait times, for the health check."""
+    connections = mongo_pool_connections.values()
+    checked_out = mongo_pool_checked_out.values()
+    failures: Dict[str, float] = {}
+    for (address, _), count in mongo_pool_checkout_failures.totals().items():
+        failures[address] = failures.get(address, 0) + count
+
+    stats = {}
+    for (address,), series in mongo_pool_checkout_wait.snapshot().items():
+        checkouts = series[-1]
+        buckets = mongo_pool_checkout_wait.buckets
+        stats[address] = {
+            "connections": int(connections.get((address,), 0)),
+            "checked_out": int(checked_out.get((address,), 0)),
+            "checkouts": checkouts,
+            "checkout_failures": int(failures.get(address, 0)),
+            "wait_mean_ms": round(series[-2] / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_p50_ms_at_most": _bucket_percentile_ms(buckets, series, 50),
+            "wait_p99_ms_at_most": _bucket_percentile_ms(buckets, series, 99),
+        }
+    return stats
+
+# --- Password hashing ---
+
+password_hash_duration = registry.register(Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password on a hashing worker.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+password_hash_queue_depth = registry.register(Gauge(
+    "password_hash_queue_depth",
+    "Hashing calls running or waiting for a hashing worker.",
+    ()
+))
+password_hash_rejected = registry.register(Counter(
+    "password_hash_rejected_total",
+    "Hashing calls rejected with 503 because the hashing queue was full.",
+    ()
+))
+
+# --- Moment write-behind ---
+
+moment_buffer_depth = registry.register(Gauge(
+    "moment_write_behind_pending",
+    "Moments acknowledged but not yet written to MongoDB.",
+    ()
+))
+moment_buffer_flush_duration = registry.register(Histogram(
+    "moment_write_behind_flush_duration_seconds",
+    "Time to write one batch of buffered moments and their rollups.",
+    ()
+))
+moment_buffer_rejected = registry.register(Counter(
+    "moment_write_behind_rejected_total",
+    "Moments refused with 503 because the write-behind queue stayed full.",
+    ()
+))
+moment_buffer_written = registry.register(Counter(
+    "moment_write_behind_written_total",
+    "Buffered moments written to MongoDB.",
+    ()
+))
+moment_buffer_dropped = registry.register(Counter(
+    "moment_write_behind_dropped_total",
+    "Acknowledged moments that were never stored: rejected by MongoDB or lost to a failed flush.",
+    ()
+))
+
+# --- Caches ---
+
+cache_entries = registry.register(Gauge(
+    "cache_entries",
+    "Entries held by each in-process cache.",
+    ("cache",)
+))
+cache_bytes = registry.register(Gauge(
+    "cache_bytes",
+    "Approximate memory held by the values of caches that track it.",
+    ("cache",)
+))
+cache_hits = registry.register(Counter(
+    "cache_hits_total",
+    "Cache lookups answered from memory.",
+    ("cache",)
+))
+cache_misses = registry.register(Counter(
+    "cache_misses_total",
+    "Cache lookups that fell through.",
+    ("cache",)
+))
+cache_invalidations_published = registry.register(Counter(
+    "cache_invalidations_published_total",
+    "Latest goal/assessment writes announced to the other workers.",
+    ()
+))
+cache_invalidations_received = registry.register(Counter(
+    "cache_invalidations_received_total",
+    "Latest goal/assessment writes announced by other workers.",
+    ()
+))
+
+# name -> TTLCache, read at scrape time
+_caches: Dict[str, object] = {}
+
+def register_cache(name: str, cache) -> None:
+    _caches[name] = cache
+
+cache_entries.set_function(lambda: {(name,): float(len(c)) for name, c in _caches.items()})
+cache_bytes.set_function(lambda: {(name,): float(c.bytes) for name, c in _caches.items() if c.sizeof})
+cache_hits.set_function(lambda: {(name,): float(c.hits) for name, c in _caches.items()})
+cache_misses.set_function(lambda: {(name,): float(c.misses) for name, c in _caches.items()})
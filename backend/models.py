@@ -3,10 +3,19 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from typing_extensions import Annotated
 
+from .rollups import VIRTUE_ID_PATTERN
+
 # Represents an ObjectId field in the database.
 # It will be represented as a `str` on the model so that it can be serialized to JSON.
 PyObjectId = Annotated[str, BeforeValidator(str)]
 
+def _normalize_virtue_id(value: Any) -> Any:
+    return value.strip().lower() if isinstance(value, str) else value
+
+# Becomes a field name in the weekly rollups ("moments.<virtue_id>"), so no
+# dots, "$" or empty ids. Lowercased first, as feedback_for() matches it
+VirtueId = Annotated[str, BeforeValidator(_normalize_virtue_id), Field(pattern=VIRTUE_ID_PATTERN, max_length=64)]
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -40,7 +49,7 @@ class AssessmentResponse(BaseModel):
 
 class MomentSubmit(BaseModel):
     content: str
-    virtue_id: str
+    virtue_id: VirtueId
 
 class MomentResponse(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -54,6 +63,27 @@ class MomentResponse(BaseModel):
         populate_by_name = True
         from_attributes = True
 
+class MomentPage(BaseModel):
+    items: List[MomentResponse]
+    # Opaque cursor for the next (older) page; None on the last page
+    next_cursor: Optional[str] = None
+
+class MomentImport(MomentSubmit):
+    # When the moment happened; defaults to the time of the import
+    timestamp: Optional[datetime] = None
+
+class MomentImportError(BaseModel):
+    # Position in the submitted array, or line among non-blank NDJSON lines
+    index: int
+    detail: str
+
+class MomentImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    # The first errors only; ``failed`` counts them all
+    errors: List[MomentImportError]
+
 class GoalSubmit(BaseModel):
     priority_virtues: List[str]
     innovation_goal: str
@@ -111,4 +141,10 @@ class Article(BaseModel):
     description: str
     url: str
     virtues: List[str]
-    imageUrl: Optional[str] = None
\ No newline at end of file
+    imageUrl: Optional[str] = None
+
+class DashboardBootstrap(BaseModel):
+    stats: DashboardStats
+    # None until onboarding is done (GET /goals and GET /assessment answer 404)
+    goals: Optional[GoalResponse] = None
+    assessment: Optional[AssessmentResponse] = None
@@ -0,0 +1,51 @@
+from typing import Dict
+
+from .cache import TTLCache
+from .config import settings
+from .latest_documents import latest_documents
+from .metrics import register_cache
+
+# Weight of each priority virtue, and of each of the weakest assessed virtues
+PRIORITY_VIRTUE_WEIGHT = 2.0
+WEAK_VIRTUE_WEIGHT = 1.0
+WEAK_VIRTUE_COUNT = 3
+
+# user_id -> {virtue_id: weight}
+virtue_profile_cache = TTLCache(
+    maxsize=settings.PROFILE_CACHE_MAX_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS
+)
+register_cache("virtue_profiles", virtue_profile_cache)
+
+def build_virtue_profile(goal, assessment) -> Dict[str, float]:
+    """
+    Weights the virtues a user wants to read about: their priority virtues,
+    plus the lowest-scoring virtues of their latest assessment.
+    """
+    weights: Dict[str, float] = {}
+    if goal:
+        for virtue in goal.get("priority_virtues", []):
+            weights[virtue] = weights.get(virtue, 0.0) + PRIORITY_VIRTUE_WEIGHT
+    if assessment:
+        scores = sorted(assessment.get("scores", []), key=lambda s: s["score"])
+        for score in scores[:WEAK_VIRTUE_COUNT]:
+            weights[score["virtueId"]] = weights.get(score["virtueId"], 0.0) + WEAK_VIRTUE_WEIGHT
+    return weights
+
+async def get_virtue_profile(db, user_id: str) -> Dict[str, float]:
+    profile = virtue_profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    goal = await latest_documents.get(db, "goals", user_id)
+    assessment = await latest_documents.get(db, "assessments", user_id)
+
+    profile = build_virtue_profile(goal, assessment)
+    virtue_profile_cache.set(user_id, profile)
+    return profile
+
+def invalidate_virtue_profile(user_id: str):
+    virtue_profile_cache.invalidate(user_id)
+
+# A goal or assessment written by another worker changes the profile too
+latest_documents.add_listener(lambda kind, user_id: invalidate_virtue_profile(user_id))
@@ -0,0 +1,278 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries ``X-Profile-Token: <PROFILING_TOKEN>``
+or is picked by ``PROFILING_SAMPLE_RATE``. For profiled requests:
+
+* instrumented sections are timed exactly: JWT decode, current-user lookup,
+  every MongoDB command, and each route's phases (request validation and
+  dependencies, the endpoint itself, response validation and serialization);
+* the breakdown is returned in a ``Server-Timing`` header;
+* when ``PROFILING_OUTPUT_DIR`` is set, a wall-clock sampling profiler
+  records the event loop thread's stack every millisecond while the
+  request's own code is on it and writes the samples as collapsed stacks
+  that flamegraph.pl / speedscope can render.
+
+Requests that are not profiled pay for one context variable lookup per
+instrumented section.
+"""
+import asyncio
+import functools
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from .config import settings
+
+SAMPLE_INTERVAL = 0.001
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        # name -> [seconds, count]
+        self.spans: Dict[str, List[float]] = {}
+        self.samples: Counter = Counter()
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        # Also called from Motor's executor threads, one command at a time per request
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+class span:
+    """Times the enclosed block when the current request is being profiled."""
+
+    __slots__ = ("name", "profile", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.profile = _current.get()
+        if self.profile is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class ProfilingCommandListener(monitoring.CommandListener):
+    # Motor runs driver calls with a copy of the caller's context, so the
+    # request's profile is visible from the executor thread.
+    def started(self, event):
+        pass
+
+    def _record(self, event):
+        profile = _current.get()
+        if profile is not None:
+            profile.add(f"mongo.{event.command_name}", event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+command_listener = ProfilingCommandListener()
+
+# --- Sampling ---
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+class _SwitchInterval:
+    """
+    Shortens sys.getswitchinterval() while any sampler is running. The
+    interval is interpreter-wide, so every request in the worker pays the
+    extra GIL hand-offs while one of them is sampled.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.saved = sys.getswitchinterval()
+
+    def acquire(self):
+        with self.lock:
+            if self.active == 0:
+                self.saved = sys.getswitchinterval()
+                sys.setswitchinterval(SAMPLE_INTERVAL / 4)
+            self.active += 1
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+            if self.active == 0:
+                sys.setswitchinterval(self.saved)
+
+_switch_interval = _SwitchInterval()
+
+class Sampler(threading.Thread):
+    """
+    Samples ``thread_id``'s stack, keeping only samples taken while
+    ``anchor`` (the profiled request's middleware frame) is on that stack,
+    i.e. while this request, not a concurrent one, holds the event loop.
+    """
+
+    def __init__(self, thread_id: int, anchor, profile: RequestProfile):
+        super().__init__(daemon=True, name="request-profiler")
+        self.thread_id = thread_id
+        self.anchor = anchor
+        self.profile = profile
+        self.stopped = threading.Event()
+
+    def run(self):
+        # The event loop thread only hands over the GIL every switch interval
+        # (5ms by default), which would cap the sample rate well below ours
+        _switch_interval.acquire()
+        try:
+            self._sample()
+        finally:
+            _switch_interval.release()
+
+    def _sample(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            ours = False
+            while frame is not None:
+                if frame is self.anchor:
+                    ours = True
+                    break
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if ours and stack:
+                self.profile.samples[";".join(reversed(stack))] += 1
+
+# --- Routes ---
+
+class ProfiledRoute(APIRoute):
+    """
+    Splits a route's time into request validation (body parsing and
+    dependencies, including authentication), the endpoint, and response
+    validation plus serialization.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap_endpoint(endpoint):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            profile.endpoint_started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.endpoint_finished = time.perf_counter()
+        return timed_endpoint
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            profile = _current.get()
+            if profile is None:
+                return await handler(request)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                finished = time.perf_counter()
+                if profile.endpoint_started is None:
+                    profile.add("request_validation", finished - started)
+                else:
+                    profile.add("request_validation", profile.endpoint_started - started)
+                    profile.add("endpoint", profile.endpoint_finished - profile.endpoint_started)
+                    profile.add("response_serialization", finished - profile.endpoint_finished)
+        return timed_handler
+
+# --- Middleware ---
+
+def server_timing(profile: RequestProfile, total: float) -> str:
+    entries = [f"total;dur={total * 1000:.2f}"]
+    mongo_total = 0.0
+    mongo_count = 0
+    for name, (seconds, count) in sorted(profile.spans.items()):
+        if name.startswith("mongo."):
+            mongo_total += seconds
+            mongo_count += count
+        entries.append(f'{name.replace(".", "-")};dur={seconds * 1000:.2f};desc="x{count}"')
+    if mongo_count:
+        entries.append(f'mongo;dur={mongo_total * 1000:.2f};desc="{mongo_count} commands"')
+    if profile.samples:
+        entries.append(f'sampled;desc="{sum(profile.samples.values())} stacks"')
+    return ", ".join(entries)
+
+def write_collapsed_stacks(profile: RequestProfile, method: str, path: str) -> None:
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{method}{path.replace('/', '_')}-{os.getpid()}.folded"
+    with open(os.path.join(settings.PROFILING_OUTPUT_DIR, name), "w") as f:
+        for stack, count in profile.samples.items():
+            f.write(f"{stack} {count}\n")
+
+def _should_profile(scope) -> bool:
+    if settings.PROFILING_TOKEN:
+        for key, value in scope["headers"]:
+            if key == b"x-profile-token":
+                return value.decode() == settings.PROFILING_TOKEN
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        sampler = None
+        if settings.PROFILING_OUTPUT_DIR:
+            sampler = Sampler(threading.get_ident(), sys._getframe(), profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # The body is fully rendered by the time headers go out
+                if sampler is not None:
+                    sampler.stopped.set()
+                total = time.perf_counter() - profile.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(profile, total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if sampler is not None:
+            sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if sampler is not None:
+                sampler.stopped.set()
+            if profile.samples:
+                await asyncio.to_thread(write_collapsed_stacks, profile, scope["method"], scope["path"])
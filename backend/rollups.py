@@ -0,0 +1,221 @@
+"""
+Weekly per-virtue rollups of moments and assessments.
+
+One document per (user, week) lives in ``virtue_weekly_rollups``:
+
+    {
+        "user_id": "...",
+        "week_start": <Monday 00:00 UTC>,
+        "moment_count": 12,
+        "moments": {"courage": 5, "wisdom": 7},
+        "assessment_count": 1,
+        "score_sums": {"courage": 4.0, ...},
+        "score_counts": {"courage": 1, ...}
+    }
+
+They are maintained incrementally on every write so the dashboard reads a
+handful of small documents instead of scanning raw history. If they ever
+drift (or after a bulk import), rebuild them from raw data:
+
+    python -m backend.rollups backfill [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+ROLLUPS_COLLECTION = "virtue_weekly_rollups"
+# Virtue ids usable as a field name under "moments"; MomentSubmit validates
+# against the same pattern
+VIRTUE_ID_PATTERN = r"^[a-z0-9_-]+$"
+VIRTUE_KEY = re.compile(VIRTUE_ID_PATTERN)
+
+logger = logging.getLogger(__name__)
+
+def week_start_of(moment: datetime) -> datetime:
+    """Monday 00:00 UTC of the week containing ``moment``."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    start = moment - timedelta(days=moment.weekday())
+    return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _moment_increments(virtue_id: str, count: int = 1) -> Dict[str, int]:
+    increments = {"moment_count": count}
+    # A malformed id (stored before validation, or written around it) would
+    # fail the whole $inc for its week, so it only counts towards the total
+    if isinstance(virtue_id, str) and VIRTUE_KEY.fullmatch(virtue_id):
+        increments[f"moments.{virtue_id}"] = count
+    else:
+        logger.warning("Moment virtue id %r left out of the per-virtue rollup", virtue_id)
+    return increments
+
+def _assessment_increments(scores: Iterable[Dict[str, Any]], count: int = 1) -> Dict[str, Any]:
+    increments: Dict[str, Any] = {"assessment_count": count}
+    for score in scores:
+        increments[f"score_sums.{score['virtueId']}"] = score["score"]
+        increments[f"score_counts.{score['virtueId']}"] = 1
+    return increments
+
+async def record_moment(db, user_id: str, virtue_id: str, timestamp: datetime):
+    await db[ROLLUPS_COLLECTION].update_one(
+        {"user_id": user_id, "week_start": week_start_of(timestamp)},
+        {"$inc": _moment_increments(virtue_id)},
+        upsert=True
+    )
+
+def count_moments(moments: Iterable[Dict[str, Any]], increments: Optional[Dict[tuple, Dict[str, int]]] = None) -> Dict[tuple, Dict[str, int]]:
+    """Adds the moments' rollup increments, keyed on (user_id, week_start), to ``increments``."""
+    increments = {} if increments is None else increments
+    for moment in moments:
+        key = (moment["user_id"], week_start_of(moment["timestamp"]))
+        week = increments.setdefault(key, {})
+        for field, count in _moment_increments(moment["virtue_id"]).items():
+            week[field] = week.get(field, 0) + count
+    return increments
+
+async def record_moments(db, moments: Iterable[Dict[str, Any]]) -> int:
+    """Rollup increments for many moments at once; see ``apply_moment_counts``."""
+    return await apply_moment_counts(db, count_moments(moments))
+
+async def apply_moment_counts(db, increments: Dict[tuple, Dict[str, int]]) -> int:
+    """
+    One upsert per (user, week) touched, sent as a single unordered bulk
+    write. Returns the number of rollup documents updated.
+    """
+    if not increments:
+        return 0
+    await db[ROLLUPS_COLLECTION].bulk_write([
+        UpdateOne({"user_id": user_id, "week_start": week_start}, {"$inc": inc}, upsert=True)
+        for (user_id, week_start), inc in increments.items()
+    ], ordered=False)
+    return len(increments)
+
+async def record_assessment(db, user_id: str, scores: List[Dict[str, Any]], timestamp: datetime):
+    await db[ROLLUPS_COLLECTION].update_one(
+        {"user_id": user_id, "week_start": week_start_of(timestamp)},
+        {"$inc": _assessment_increments(scores)},
+        upsert=True
+    )
+
+def _average_scores(rollup: Dict[str, Any]) -> Dict[str, float]:
+    sums = rollup.get("score_sums", {})
+    counts = rollup.get("score_counts", {})
+    return {v: sums[v] / counts[v] for v in sums if counts.get(v)}
+
+async def weekly_history(db, user_id: str, weeks: int = 5, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    One entry per week (oldest first) with the average assessment score per
+    virtue and the number of moments logged per virtue. Weeks without an
+    assessment carry the most recent earlier scores forward.
+    """
+    current_week = week_start_of(now or datetime.now(timezone.utc))
+    week_starts = [current_week - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+    collection = db[ROLLUPS_COLLECTION]
+
+    cursor = collection.find({"user_id": user_id, "week_start": {"$gte": week_starts[0]}})
+    rollups = {week_start_of(r["week_start"]): r for r in await cursor.to_list(length=weeks)}
+
+    # Scores in effect when the window opens
+    carried = await collection.find_one(
+        {"user_id": user_id, "week_start": {"$lt": week_starts[0]}, "assessment_count": {"$gt": 0}},
+        sort=[("week_start", -1)]
+    )
+    scores = _average_scores(carried) if carried else {}
+
+    history = []
+    for week_start in week_starts:
+        rollup = rollups.get(week_start, {})
+        if rollup.get("assessment_count"):
+            scores = {**scores, **_average_scores(rollup)}
+        entry: Dict[str, Any] = {"date": week_start.strftime("%Y-%m-%d")}
+        entry.update({v: round(score, 1) for v, score in scores.items()})
+        entry["moments"] = dict(rollup.get("moments", {}))
+        history.append(entry)
+    return history
+
+async def rebuild_rollups(db, user_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Recomputes rollups from the raw moments and assessments collections,
+    for one user or for everyone. Returns the number of rollup documents
+    written. Writes that land while the rebuild runs may be double counted,
+    so run it during a quiet period.
+    """
+    match = {"user_id": user_id} if user_id else {}
+    await db[ROLLUPS_COLLECTION].delete_many(match)
+
+    def week_key(field: str):
+        return {"year": {"$isoWeekYear": field}, "week": {"$isoWeek": field}}
+
+    def week_of(key: Dict[str, int]) -> datetime:
+        return datetime.fromisocalendar(key["year"], key["week"], 1).replace(tzinfo=timezone.utc)
+
+    operations = []
+    written = 0
+
+    async def flush():
+        nonlocal operations, written
+        if operations:
+            result = await db[ROLLUPS_COLLECTION].bulk_write(operations, ordered=False)
+            written += result.upserted_count
+            operations = []
+
+    moments_pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "virtue": "$virtue_id", **week_key("$timestamp")},
+            "count": {"$sum": 1}
+        }}
+    ]
+    async for group in db.moments.aggregate(moments_pipeline, allowDiskUse=True):
+        key = group["_id"]
+        operations.append(UpdateOne(
+            {"user_id": key["user_id"], "week_start": week_of(key)},
+            {"$inc": _moment_increments(key["virtue"], group["count"])},
+            upsert=True
+        ))
+        if len(operations) >= batch_size:
+            await flush()
+
+    assessments_pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"user_id": "$user_id", **week_key("$created_at")},
+            "count": {"$sum": 1},
+            "scores": {"$push": "$scores"}
+        }}
+    ]
+    async for group in db.assessments.aggregate(assessments_pipeline, allowDiskUse=True):
+        key = group["_id"]
+        increments: Dict[str, Any] = {"assessment_count": group["count"]}
+        for scores in group["scores"]:
+            for field, value in _assessment_increments(scores, 0).items():
+                if field != "assessment_count":
+                    increments[field] = increments.get(field, 0) + value
+        operations.append(UpdateOne(
+            {"user_id": key["user_id"], "week_start": week_of(key)},
+            {"$inc": increments},
+            upsert=True
+        ))
+        if len(operations) >= batch_size:
+            await flush()
+
+    await flush()
+    return written
+
+async def _main(args) -> None:
+    from .database import connect
+
+    db = connect()
+    written = await rebuild_rollups(db, user_id=args.user_id)
+    print(f"Rebuilt rollups: {written} documents")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain weekly virtue rollups.")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--user-id", help="Only rebuild this user's rollups")
+    asyncio.run(_main(parser.parse_args()))
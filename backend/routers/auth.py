@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from ..database import get_db
+from ..database import get_db, insert_document
 from ..models import UserCreate, UserResponse, UserInDB
-from ..auth import get_password_hash, verify_password, create_access_token
+from ..auth import get_password_hash_async, verify_password_async, create_access_token, user_token_claims
+from ..profiling import ProfiledRoute
 from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["auth"]
 )
 
@@ -19,7 +22,7 @@ async def signup(user: UserCreate, db = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     user_in_db = UserInDB(
         email=user.email,
         hashed_password=hashed_password,
@@ -29,13 +32,19 @@ async def signup(user: UserCreate, db = Depends(get_db)):
     # Exclude id/None from insertion
     user_dict = user_in_db.model_dump(by_alias=True, exclude=["id"])
     
-    new_user = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": new_user.inserted_id})
+    try:
+        created_user = await insert_document(db.users, user_dict)
+    except DuplicateKeyError:
+        # A concurrent signup with the same email won the email_unique index
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     user_response = UserResponse(**created_user)
     
     # Create token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data=user_token_claims(user_response))
     
     return {
         "token": access_token,
@@ -47,15 +56,15 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(g
     # OAuth2PasswordRequestForm expects "username" and "password"
     # We treat "username" as "email"
     user = await db.users.find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user["email"]})
     user_response = UserResponse(**user)
+    access_token = create_access_token(data=user_token_claims(user_response))
     
     return {
         "token": access_token,
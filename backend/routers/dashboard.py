@@ -1,30 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
-import random
-from ..database import get_db
+import asyncio
+from ..database import get_db, get_read_db
 from ..models import (
     DashboardStats, WeeklyReflection, UserResponse, 
     VirtueScore, CalendarInsight, AssessmentResponse,
-    GoalResponse
+    GoalResponse, DashboardBootstrap
 )
 from ..auth import get_current_user
+from ..rollups import weekly_history
+from ..profiles import build_virtue_profile, virtue_profile_cache
+from ..latest_documents import latest_documents
+from ..profiling import ProfiledRoute
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["dashboard"]
 )
 
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
     current_user: UserResponse = Depends(get_current_user),
-    db = Depends(get_db)
+    db = Depends(get_db),
+    read_db = Depends(get_read_db)
 ):
     # Get current scores from latest assessment
-    assessment = await db.assessments.find_one(
-        {"user_id": str(current_user.id)},
-        sort=[("_id", -1)]
-    )
-    
+    assessment = await latest_documents.get(db, "assessments", str(current_user.id))
+
+    # Weekly history from the materialized rollups
+    history = await weekly_history(read_db, str(current_user.id), weeks=5)
+
+    return build_dashboard_stats(assessment, history)
+
+def build_dashboard_stats(assessment: Optional[dict], history: List[Dict[str, Any]]) -> DashboardStats:
     current_scores = []
     if assessment and "scores" in assessment:
         # Ensure we have a list of objects that match VirtueScore
@@ -38,108 +47,166 @@ async def get_dashboard_stats(
             {"virtueId": v.lower(), "score": 5.0} for v in virtues
         ]
 
-    # Generate Mock History
-    # We want a few data points representing previous weeks
-    history = []
-    dates = []
-    now = datetime.now(timezone.utc)
-    for i in range(4, -1, -1): # 5 weeks including current
-        dates.append(now - timedelta(weeks=i))
-    
-    # Base scores on current scores to make it look realistic but varying
-    # Helper to get score value regardless of whether it's a dict or object
-    def get_score_val(s):
-        if isinstance(s, dict):
-            return s.get("score", 5.0)
-        return s.score
-
-    def get_virtue_id(s):
-        if isinstance(s, dict):
-            return s.get("virtueId", "unknown")
-        return s.virtueId
-
-    base_scores_map = {get_virtue_id(s): get_score_val(s) for s in current_scores}
-    
-    for date in dates:
-        entry = {"date": date.strftime("%Y-%m-%d")}
-        for virtue_id, score in base_scores_map.items():
-            # Add some random variation
-            variation = random.uniform(-1.0, 1.0)
-            hist_score = max(0, min(10, score + variation))
-            entry[virtue_id] = round(hist_score, 1)
-        history.append(entry)
-
     return DashboardStats(
         currentScores=current_scores,
         history=history
     )
 
-@router.get("/reflection/weekly", response_model=WeeklyReflection)
-async def get_weekly_reflection(
-    current_user: UserResponse = Depends(get_current_user),
-    db = Depends(get_db)
-):
-    # 1. Get User's Goals (Focus)
-    goal = await db.goals.find_one(
-        {"user_id": str(current_user.id)},
-        sort=[("_id", -1)]
-    )
-    
-    focus_areas = []
-    if goal:
-        focus_areas = goal.get("priority_virtues", [])
-    
-    # 2. Get Recent Moments
-    # Last 7 days
-    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    moments_cursor = db.moments.find({
-        "user_id": str(current_user.id),
-        "timestamp": {"$gte": seven_days_ago}
-    })
-    moments = await moments_cursor.to_list(length=None)
-    
-    moment_count = len(moments)
-    
-    # 3. Generate Summary
+# $dayOfWeek numbering: 1 = Sunday ... 7 = Saturday
+DAY_NAMES = {
+    1: "Sunday", 2: "Monday", 3: "Tuesday", 4: "Wednesday",
+    5: "Thursday", 6: "Friday", 7: "Saturday"
+}
+
+def time_of_day(hour: int) -> str:
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 22:
+        return "evening"
+    return "night"
+
+async def summarize_moments(db, user_id: str, since: datetime) -> Dict[str, Any]:
+    # Counts are computed server-side; only one small document per
+    # (virtue, day, hour) combination travels back instead of every moment.
+    pipeline = [
+        {"$match": {"user_id": user_id, "timestamp": {"$gte": since}}},
+        {"$group": {
+            "_id": {
+                "virtue": "$virtue_id",
+                "day": {"$dayOfWeek": "$timestamp"},
+                "hour": {"$hour": "$timestamp"}
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+    by_virtue: Dict[str, int] = {}
+    by_day: Dict[int, int] = {}
+    by_hour: Dict[int, int] = {}
+    total = 0
+    async for group in db.moments.aggregate(pipeline):
+        key, count = group["_id"], group["count"]
+        by_virtue[key["virtue"]] = by_virtue.get(key["virtue"], 0) + count
+        by_day[key["day"]] = by_day.get(key["day"], 0) + count
+        by_hour[key["hour"]] = by_hour.get(key["hour"], 0) + count
+        total += count
+
+    return {"total": total, "by_virtue": by_virtue, "by_day": by_day, "by_hour": by_hour}
+
+def most_common(counts: Dict[Any, int]):
+    # Highest count wins; ties go to the smallest key so results are stable
+    return min(counts, key=lambda k: (-counts[k], k)) if counts else None
+
+def build_weekly_reflection(summary_counts: Dict[str, Any], focus_areas: List[str]) -> WeeklyReflection:
+    moment_count = summary_counts["total"]
+
+    # 1. Summary
     if moment_count == 0:
         summary = "You haven't logged any moments this week. Start reflecting to see insights here!"
     else:
-        # Simple summary logic
-        virtues_logged = [m["virtue_id"] for m in moments]
-        if virtues_logged:
-            most_frequent = max(set(virtues_logged), key=virtues_logged.count)
-            summary = f"You've been active this week, logging {moment_count} moments. Your focus has been on {most_frequent}."
-        else:
-            summary = f"You've logged {moment_count} moments this week. Keep up the good work!"
-        
-    # 4. Generate Mock Insights
+        most_frequent = most_common(summary_counts["by_virtue"])
+        summary = f"You've been active this week, logging {moment_count} moments. Your focus has been on {most_frequent}."
+
+    # 2. Insights
     insights = []
-    
+
     if moment_count > 0:
-         insights.append(CalendarInsight(
-            id="1",
+        busiest_day = most_common(summary_counts["by_day"])
+        insights.append(CalendarInsight(
+            id=str(len(insights) + 1),
+            type="pattern",
+            message=f"{DAY_NAMES[busiest_day]} was your most reflective day, with {summary_counts['by_day'][busiest_day]} of your {moment_count} moments.",
+            virtueId=None
+        ))
+
+        periods: Dict[str, int] = {}
+        for hour, count in summary_counts["by_hour"].items():
+            periods[time_of_day(hour)] = periods.get(time_of_day(hour), 0) + count
+        favourite_period = most_common(periods)
+        insights.append(CalendarInsight(
+            id=str(len(insights) + 1),
             type="pattern",
-            message="You tend to log more moments when you are focused.",
+            message=f"You tend to log moments in the {favourite_period} (UTC).",
             virtueId=None
         ))
     else:
         insights.append(CalendarInsight(
-            id="1",
+            id=str(len(insights) + 1),
             type="suggestion",
             message="Try logging one moment today to start your streak.",
             virtueId=None
         ))
 
     if focus_areas:
-         insights.append(CalendarInsight(
-            id="2",
-            type="achievement",
-            message=f"Remember your goal to practice {focus_areas[0]}.",
-            virtueId=focus_areas[0]
-        ))
-    
+        neglected = [v for v in focus_areas if v not in summary_counts["by_virtue"]]
+        if moment_count > 0 and neglected:
+            insights.append(CalendarInsight(
+                id=str(len(insights) + 1),
+                type="suggestion",
+                message=f"You haven't logged a moment for {neglected[0]} this week, even though it's one of your goals.",
+                virtueId=neglected[0]
+            ))
+        else:
+            insights.append(CalendarInsight(
+                id=str(len(insights) + 1),
+                type="achievement",
+                message=f"Remember your goal to practice {focus_areas[0]}.",
+                virtueId=focus_areas[0]
+            ))
+
     return WeeklyReflection(
         summary=summary,
         insights=insights,
         focus=focus_areas
-    )
\ No newline at end of file
+    )
+
+@router.get("/reflection/weekly", response_model=WeeklyReflection)
+async def get_weekly_reflection(
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_db),
+    read_db = Depends(get_read_db)
+):
+    # 1. Get User's Goals (Focus)
+    goal = await latest_documents.get(db, "goals", str(current_user.id))
+    
+    focus_areas = []
+    if goal:
+        focus_areas = goal.get("priority_virtues", [])
+    
+    # 2. Summarize the last 7 days of moments
+    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    summary_counts = await summarize_moments(read_db, str(current_user.id), seven_days_ago)
+
+    return build_weekly_reflection(summary_counts, focus_areas)
+
+@router.get("/dashboard/bootstrap", response_model=DashboardBootstrap)
+async def get_dashboard_bootstrap(
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_db),
+    read_db = Depends(get_read_db)
+):
+    """
+    Everything the dashboard page shows in one round trip: the latest goal
+    and assessment are read once and shared by the stats and news-ranking
+    sections. Challenges and the weekly reflection live on the reflection
+    page and are not included.
+    """
+    user_id = str(current_user.id)
+
+    # 1. Every independent read at once
+    goal, assessment, history = await asyncio.gather(
+        latest_documents.get(db, "goals", user_id),
+        latest_documents.get(db, "assessments", user_id),
+        weekly_history(read_db, user_id, weeks=5)
+    )
+
+    # 2. Warm the personalized news profile from the same documents
+    if virtue_profile_cache.get(user_id) is None:
+        virtue_profile_cache.set(user_id, build_virtue_profile(goal, assessment))
+
+    return DashboardBootstrap(
+        stats=build_dashboard_stats(assessment, history),
+        goals=GoalResponse(**goal) if goal else None,
+        assessment=AssessmentResponse(**assessment) if assessment else None
+    )
@@ -1,13 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from typing import List, Optional
+import asyncio
+import logging
 from ..database import get_db
 from ..models import Challenge, Article, UserResponse, GoalResponse
 from ..auth import get_current_user
+from ..rollups import week_start_of
+from ..profiles import get_virtue_profile
+from ..latest_documents import latest_documents
+from ..search import ArticleIndex
+from ..singleflight import SingleFlight
+from ..profiling import ProfiledRoute
+from ..serialization import FastJSONResponse, trusted_documents
 from datetime import datetime, timezone, timedelta
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["external"]
 )
 
@@ -94,52 +108,80 @@ def generate_challenges_for_virtues(virtue_ids: List[str], user_id: str, week_st
             
     return challenges
 
-@router.get("/challenges", response_model=List[Challenge])
-async def get_challenges(
-    current_user: UserResponse = Depends(get_current_user),
-    db = Depends(get_db)
-):
-    # 1. Determine current week start (Monday)
-    now = datetime.now(timezone.utc)
-    start_of_week = now - timedelta(days=now.weekday())
-    start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # 2. Check for existing challenges for this week
-    cursor = db.challenges.find({
-        "user_id": str(current_user.id),
-        "week_start": start_of_week
-    })
-    existing_challenges = await cursor.to_list(length=100)
-    
-    if existing_challenges:
-        return [Challenge(**c) for c in existing_challenges]
-    
-    # 3. If none, get user's priority virtues
-    goal = await db.goals.find_one(
-        {"user_id": str(current_user.id)},
-        sort=[("_id", pymongo.DESCENDING)]
-    )
-    
+# Matches the unique challenges index: one copy of each challenge per user/week
+CHALLENGE_KEY_FIELDS = ("user_id", "week_start", "virtueId", "title")
+
+def challenge_upserts(challenge_docs: List[dict]) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {field: doc[field] for field in CHALLENGE_KEY_FIELDS},
+            {"$setOnInsert": doc},
+            upsert=True
+        )
+        for doc in challenge_docs
+    ]
+
+async def store_challenges(db, challenge_docs: List[dict]) -> bool:
+    """
+    Idempotently writes generated challenges. Returns True when every
+    document was inserted by this call (their _ids are then set on the
+    docs), False when some already existed, e.g. another worker won the race.
+    """
+    try:
+        result = await db.challenges.bulk_write(challenge_upserts(challenge_docs), ordered=False)
+    except BulkWriteError as e:
+        # Concurrent upserts on the unique key can collide; the winner's
+        # documents are already stored.
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        return False
+
+    for index, upserted_id in result.upserted_ids.items():
+        challenge_docs[index]["_id"] = upserted_id
+    return result.upserted_count == len(challenge_docs)
+
+async def generate_weekly_challenges(db, user_id: str, week_start: datetime, goal: Optional[dict]) -> List[dict]:
+    """Generates and stores the week's challenges from the user's latest goal."""
     priority_virtues = []
     if goal:
         priority_virtues = goal.get("priority_virtues", [])
-    
-    # 4. Generate new challenges
-    new_challenge_docs = generate_challenges_for_virtues(priority_virtues, str(current_user.id), start_of_week)
-    
+
+    new_challenge_docs = generate_challenges_for_virtues(priority_virtues, user_id, week_start)
     if not new_challenge_docs:
         return []
 
-    await db.challenges.insert_many(new_challenge_docs)
-    
-    # 5. Return newly created challenges
-    # Re-fetch to get IDs
-    cursor = db.challenges.find({
-        "user_id": str(current_user.id),
-        "week_start": start_of_week
-    })
-    created_challenges = await cursor.to_list(length=100)
-    return [Challenge(**c) for c in created_challenges]
+    if await store_challenges(db, new_challenge_docs):
+        return new_challenge_docs
+    return await db.challenges.find({"user_id": user_id, "week_start": week_start}).to_list(length=100)
+
+async def load_or_generate_challenges(db, user_id: str, week_start: datetime) -> List[dict]:
+    # 1. Check for existing challenges for this week
+    existing_challenges = await db.challenges.find(
+        {"user_id": user_id, "week_start": week_start}
+    ).to_list(length=100)
+    if existing_challenges:
+        return existing_challenges
+
+    # 2. If none, generate them from the user's priority virtues
+    goal = await latest_documents.get(db, "goals", user_id)
+    return await generate_weekly_challenges(db, user_id, week_start, goal)
+
+# Concurrent first loads of a week (e.g. two open tabs) share one generation
+challenge_flights = SingleFlight()
+
+@router.get("/challenges", response_model=List[Challenge])
+async def get_challenges(
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    user_id = str(current_user.id)
+    start_of_week = week_start_of(datetime.now(timezone.utc))
+
+    challenges = await challenge_flights.do(
+        (user_id, start_of_week),
+        lambda: load_or_generate_challenges(db, user_id, start_of_week)
+    )
+    return FastJSONResponse(trusted_documents(Challenge, challenges))
 
 
 @router.patch("/challenges/{challenge_id}", response_model=Challenge)
@@ -223,17 +265,69 @@ MOCK_NEWS_ARTICLES = [
   },
 ]
 
+# Articles are served from an in-memory inverted index. It starts out with the
+# mock articles and is replaced by the ``articles`` collection once that has
+# any documents; documents need an ``updated_at`` to be picked up
+# incrementally, and ``deleted: true`` removes an article from the index.
+news_index = ArticleIndex()
+news_index.build(Article(**a).model_dump() for a in MOCK_NEWS_ARTICLES)
+
+def article_from_doc(doc: dict) -> dict:
+    return Article(**{**doc, "id": doc.get("id") or str(doc["_id"])}).model_dump()
+
+async def refresh_news_index(db, since: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Loads articles changed after ``since`` (everything when None) into the
+    index and returns the newest ``updated_at`` seen, to pass to the next call.
+    """
+    query = {"updated_at": {"$gt": since}} if since else {}
+    cursor = db.articles.find(query).sort("updated_at", 1).batch_size(1000)
+
+    latest = since
+    if since is None:
+        # Full load; build() runs without awaiting, so searches never see a
+        # partially built index
+        articles = []
+        async for doc in cursor:
+            if not doc.get("deleted"):
+                articles.append(article_from_doc(doc))
+            if doc.get("updated_at") and (latest is None or doc["updated_at"] > latest):
+                latest = doc["updated_at"]
+        if articles:
+            news_index.build(articles)
+        return latest
+
+    async for doc in cursor:
+        if doc.get("deleted"):
+            news_index.remove(doc.get("id") or str(doc["_id"]))
+        else:
+            news_index.add(article_from_doc(doc))
+        latest = max(latest, doc["updated_at"])
+    return latest
+
+async def keep_news_index_fresh(db, interval: float, since: Optional[datetime] = None):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            since = await refresh_news_index(db, since)
+        except Exception:
+            logger.exception("News index refresh failed")
+
 @router.get("/news", response_model=List[Article])
 async def get_news(
     q: Optional[str] = None,
-    current_user: UserResponse = Depends(get_current_user)
+    virtue: Optional[List[str]] = Query(None),
+    rank: str = Query("relevance", pattern="^(relevance|personal)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_db)
 ):
-    if not q:
-        return [Article(**a) for a in MOCK_NEWS_ARTICLES]
-    
-    query = q.lower()
-    filtered = [
-        a for a in MOCK_NEWS_ARTICLES 
-        if query in a["title"].lower() or query in a["description"].lower()
-    ]
-    return [Article(**a) for a in filtered]
\ No newline at end of file
+    if rank == "personal":
+        # Priority virtues and weakest assessed virtues first
+        profile = await get_virtue_profile(db, str(current_user.id))
+        total, articles = news_index.personalized(profile, q, virtues=virtue, limit=limit, offset=offset)
+    else:
+        total, articles = news_index.search(q, virtues=virtue, limit=limit, offset=offset)
+    # Index entries are already Article.model_dump() output
+    return FastJSONResponse(articles, headers={"X-Total-Count": str(total)})
\ No newline at end of file
@@ -1,11 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from datetime import datetime, timezone
-from typing import List
-from ..database import get_db
-from ..models import MomentSubmit, MomentResponse, UserResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import asyncio
+import base64
+import csv
+import io
+import json
+import logging
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from ..config import settings
+from ..database import get_db, get_read_db, insert_document
+from ..models import (
+    MomentSubmit, MomentResponse, MomentPage, UserResponse,
+    MomentImport, MomentImportResult
+)
 from ..auth import get_current_user
+from ..rollups import record_moment, count_moments, apply_moment_counts
+from ..write_behind import moment_writer, WriteBehindFull
+from ..profiling import ProfiledRoute
+from ..serialization import FastJSONResponse, trusted_documents
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["moments"]
 )
 
@@ -29,36 +52,431 @@ VIRTUE_FEEDBACK = {
     "spirituality": "Connecting to something greater brings peace. Deep work!"
 }
 
+def feedback_for(virtue_id: str) -> str:
+    return VIRTUE_FEEDBACK.get(
+        virtue_id.lower(), 
+        f"Great job practicing {virtue_id}!"
+    )
+
 @router.post("/moments", response_model=MomentResponse)
 async def create_moment(
     moment: MomentSubmit,
     current_user: UserResponse = Depends(get_current_user),
     db = Depends(get_db)
 ):
-    feedback = VIRTUE_FEEDBACK.get(
-        moment.virtue_id.lower(), 
-        f"Great job practicing {moment.virtue_id}!"
-    )
-    
     new_moment = {
         "user_id": str(current_user.id),
         "content": moment.content,
         "virtue_id": moment.virtue_id,
-        "feedback": feedback,
+        "feedback": feedback_for(moment.virtue_id),
         "timestamp": datetime.now(timezone.utc)
     }
+
+    if moment_writer is not None:
+        # Acknowledged now, inserted with the next batch. Millisecond
+        # timestamps, as stored, so pages built from the queued copy and
+        # from MongoDB agree on the cursor order
+        timestamp = new_moment["timestamp"]
+        new_moment["timestamp"] = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+        new_moment["_id"] = ObjectId()
+        try:
+            await moment_writer.submit(new_moment)
+        except WriteBehindFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        return MomentResponse(**new_moment)
     
-    result = await db.moments.insert_one(new_moment)
-    created_moment = await db.moments.find_one({"_id": result.inserted_id})
+    created_moment = await insert_document(db.moments, new_moment)
+    await record_moment(db, new_moment["user_id"], new_moment["virtue_id"], new_moment["timestamp"])
     
     return MomentResponse(**created_moment)
 
-@router.get("/moments", response_model=List[MomentResponse])
+# Pages are ordered newest first on (timestamp, _id), matching the
+# moments(user_id, timestamp desc, _id desc) index.
+MOMENT_SORT = [("timestamp", -1), ("_id", -1)]
+
+def encode_cursor(moment: dict) -> str:
+    raw = f"{moment['timestamp'].isoformat()}|{moment['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def sort_key(moment: dict):
+    return moment["timestamp"], moment["_id"]
+
+def as_utc(moment: datetime) -> datetime:
+    # Query parameters may be naive; MongoDB reads those as UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, moment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), ObjectId(moment_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/moments", response_model=MomentPage)
 async def get_moments(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    virtue_id: Optional[str] = None,
     current_user: UserResponse = Depends(get_current_user),
     db = Depends(get_db)
 ):
-    moments_cursor = db.moments.find({"user_id": str(current_user.id)}).sort("timestamp", -1)
-    moments = await moments_cursor.to_list(length=None)
-    
-    return [MomentResponse(**moment) for moment in moments]
\ No newline at end of file
+    user_id = str(current_user.id)
+    query = {"user_id": user_id}
+    if virtue_id:
+        query["virtue_id"] = virtue_id
+
+    timestamp_range = {}
+    if start:
+        timestamp_range["$gte"] = start
+    if end:
+        timestamp_range["$lt"] = end
+    if timestamp_range:
+        query["timestamp"] = timestamp_range
+
+    last_key = None
+    if cursor:
+        # Keyset condition: strictly older than the last item of the previous page
+        last_timestamp, last_id = decode_cursor(cursor)
+        last_key = (last_timestamp, last_id)
+        query = {"$and": [query, {"$or": [
+            {"timestamp": {"$lt": last_timestamp}},
+            {"timestamp": last_timestamp, "_id": {"$lt": last_id}}
+        ]}]}
+
+    # Read-your-writes: the user's unflushed moments. Taken before the query,
+    # so that one flushed in between is found by the query instead. Only this
+    # worker's queue is visible here; with several workers a moment queued by
+    # another one shows up after its flush
+    pending = moment_writer.pending_for(user_id) if moment_writer is not None else []
+
+    # Fetch one extra document to know whether another page exists
+    moments_cursor = db.moments.find(query).sort(MOMENT_SORT).limit(limit + 1)
+    moments = await moments_cursor.to_list(length=limit + 1)
+
+    pending = [
+        m for m in pending
+        if (not virtue_id or m["virtue_id"] == virtue_id)
+        and (not start or m["timestamp"] >= as_utc(start))
+        and (not end or m["timestamp"] < as_utc(end))
+        and (last_key is None or sort_key(m) < last_key)
+    ]
+    if pending:
+        seen = {m["_id"] for m in moments}
+        moments += [m for m in pending if m["_id"] not in seen]
+        moments.sort(key=sort_key, reverse=True)
+        moments = moments[:limit + 1]
+
+    next_cursor = None
+    if len(moments) > limit:
+        moments = moments[:limit]
+        next_cursor = encode_cursor(moments[-1])
+
+    return FastJSONResponse({
+        "items": trusted_documents(MomentResponse, moments),
+        "next_cursor": next_cursor
+    })
+
+# --- Bulk import ---
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+# Only the first errors are listed in the response
+MAX_REPORTED_ERRORS = 1000
+# Imported timestamps may run this far ahead of the server clock
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+async def _ndjson_items(request: Request):
+    # Yields each non-blank line as it arrives, so the body is never held
+    # whole. A line over MOMENT_IMPORT_MAX_LINE_BYTES is yielded as a
+    # ValueError, to be reported for its position, and the rest of it skipped
+    max_line = settings.MOMENT_IMPORT_MAX_LINE_BYTES
+    buffer = bytearray()
+    skipping = False
+    async for chunk in request.stream():
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, rest = buffer.split(b"\n")
+            buffer = bytearray(rest)
+            for line in lines:
+                if skipping:
+                    # The tail of the line already reported as too long
+                    skipping = False
+                elif line.strip():
+                    yield bytes(line)
+        if len(buffer) > max_line:
+            if not skipping:
+                yield ValueError(f"Line is longer than {max_line} bytes")
+                skipping = True
+            buffer.clear()
+    if buffer.strip() and not skipping:
+        yield bytes(buffer)
+
+def _json_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"JSON array imports are limited to {settings.MOMENT_IMPORT_MAX_JSON_BYTES} bytes; "
+               "send larger imports as NDJSON (Content-Type: application/x-ndjson)"
+    )
+
+async def _json_array_items(request: Request):
+    # The array is parsed in one go, so refuse oversized bodies before (or
+    # while) reading them rather than after
+    max_bytes = settings.MOMENT_IMPORT_MAX_JSON_BYTES
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise _json_too_large()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise _json_too_large()
+
+    try:
+        items = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        items = None
+    del body
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=400,
+            detail="Body must be a JSON array, or NDJSON with Content-Type: application/x-ndjson"
+        )
+    for item in items:
+        yield item
+
+def _import_document(item, user_id: str, now: datetime) -> dict:
+    # Raw NDJSON lines are parsed here so a bad line only fails itself
+    if isinstance(item, ValueError):
+        raise item
+    if isinstance(item, bytes):
+        item = orjson.loads(item)
+    moment = MomentImport.model_validate(item)
+    timestamp = moment.timestamp or now
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    if timestamp > now + MAX_CLOCK_SKEW:
+        raise ValueError("timestamp is in the future")
+    return {
+        "user_id": user_id,
+        "content": moment.content,
+        "virtue_id": moment.virtue_id,
+        "feedback": feedback_for(moment.virtue_id),
+        "timestamp": timestamp
+    }
+
+def _error_detail(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors()
+        )
+    if isinstance(error, orjson.JSONDecodeError):
+        return f"Invalid JSON: {error}"
+    return str(error)
+
+class _ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        # Rollup increments of everything inserted, applied once at the end
+        self.rollups: Dict[tuple, Dict[str, int]] = {}
+
+    def error(self, index: int, detail: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "detail": detail})
+
+async def _insert_chunk(db, chunk: List[tuple], report: _ImportReport):
+    # chunk: (index in the request, document) pairs
+    rejected = {}
+    try:
+        await db.moments.insert_many([document for _, document in chunk], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            rejected[error["index"]] = error.get("errmsg", "Write failed")
+
+    inserted = []
+    for position, (index, document) in enumerate(chunk):
+        if position in rejected:
+            report.error(index, rejected[position])
+        else:
+            inserted.append(document)
+    report.inserted += len(inserted)
+    count_moments(inserted, report.rollups)
+
+@router.post(
+    "/moments/bulk",
+    response_model=MomentImportResult,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": {"type": "array", "items": MomentImport.model_json_schema()}},
+        "application/x-ndjson": {"schema": MomentImport.model_json_schema()},
+    }}}
+)
+async def import_moments(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Imports many moments from a JSON array or an NDJSON stream of
+    ``{"content", "virtue_id", "timestamp"?}`` items. Items are validated
+    and inserted in chunks; invalid or rejected items are reported by
+    position without stopping the rest.
+    """
+    user_id = str(current_user.id)
+    now = datetime.now(timezone.utc)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = _ndjson_items(request)
+    else:
+        items = _json_array_items(request)
+
+    report = _ImportReport()
+    chunk: List[tuple] = []
+    # One chunk is inserted while the next one is read and validated
+    insert_task: Optional[asyncio.Task] = None
+    try:
+        async for item in items:
+            index = report.received
+            if index >= settings.MOMENT_IMPORT_MAX_ITEMS:
+                report.error(index, f"Import limit of {settings.MOMENT_IMPORT_MAX_ITEMS} items reached; the rest was not read")
+                break
+            report.received += 1
+            try:
+                chunk.append((index, _import_document(item, user_id, now)))
+            except ValueError as e:
+                # Includes pydantic's ValidationError and orjson's JSONDecodeError
+                report.error(index, _error_detail(e))
+
+            if len(chunk) >= settings.MOMENT_IMPORT_CHUNK_SIZE:
+                if insert_task is not None:
+                    await insert_task
+                insert_task = asyncio.create_task(_insert_chunk(db, chunk, report))
+                chunk = []
+
+        if chunk:
+            if insert_task is not None:
+                await insert_task
+            insert_task = asyncio.create_task(_insert_chunk(db, chunk, report))
+    finally:
+        # Whatever was inserted reaches the rollups, even if the upload broke
+        # off or a later chunk failed to insert
+        try:
+            if insert_task is not None:
+                await insert_task
+        finally:
+            try:
+                await apply_moment_counts(db, report.rollups)
+            except Exception:
+                # The moments are stored and reported; the rollups can be
+                # rebuilt from them with `python -m backend.rollups backfill`
+                logger.exception("Rollup update for %d imported moments failed", report.inserted)
+
+    return MomentImportResult(
+        received=report.received,
+        inserted=report.inserted,
+        failed=report.failed,
+        errors=report.errors
+    )
+
+# --- Export ---
+
+# (record type, collection, projection, sort) in export order
+EXPORT_SOURCES = [
+    ("moment", "moments",
+     {"content": 1, "virtue_id": 1, "feedback": 1, "timestamp": 1},
+     [("timestamp", 1), ("_id", 1)]),
+    ("assessment", "assessments",
+     {"scores": 1, "narrative_profile": 1, "created_at": 1},
+     [("_id", 1)]),
+    ("goal", "goals",
+     {"priority_virtues": 1, "innovation_goal": 1, "created_at": 1},
+     [("_id", 1)]),
+    ("challenge", "challenges",
+     {"title": 1, "description": 1, "virtueId": 1, "status": 1, "week_start": 1},
+     [("week_start", 1), ("_id", 1)]),
+]
+
+EXPORT_CSV_FIELDS = [
+    "type", "_id", "timestamp", "created_at", "week_start", "virtue_id", "virtueId",
+    "content", "feedback", "title", "description", "status",
+    "priority_virtues", "innovation_goal", "scores", "narrative_profile"
+]
+
+EXPORT_BATCH_SIZE = 1000
+# Number of records joined into one chunk of the streamed body
+EXPORT_CHUNK_RECORDS = 500
+
+def _export_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+def _format_ndjson(record: dict) -> str:
+    return json.dumps(record, default=_export_value, separators=(",", ":")) + "\n"
+
+def _format_csv_row(record: dict) -> str:
+    row = []
+    for field in EXPORT_CSV_FIELDS:
+        value = record.get(field)
+        if value is None:
+            row.append("")
+        elif isinstance(value, (list, dict)):
+            row.append(json.dumps(value, default=_export_value, separators=(",", ":")))
+        elif isinstance(value, (ObjectId, datetime)):
+            row.append(_export_value(value))
+        else:
+            row.append(value)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+async def _export_records(db, user_id: str, formatter):
+    # Reads every source with a batched cursor and yields the body in chunks,
+    # so memory stays constant no matter how large the journal is.
+    chunk = []
+    for record_type, collection_name, projection, sort in EXPORT_SOURCES:
+        cursor = db[collection_name].find({"user_id": user_id}, projection)
+        cursor = cursor.sort(sort).batch_size(EXPORT_BATCH_SIZE)
+        async for doc in cursor:
+            chunk.append(formatter({"type": record_type, **doc}))
+            if len(chunk) >= EXPORT_CHUNK_RECORDS:
+                yield "".join(chunk)
+                chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+async def _export_csv(db, user_id: str):
+    header = io.StringIO()
+    csv.writer(header).writerow(EXPORT_CSV_FIELDS)
+    yield header.getvalue()
+    async for chunk in _export_records(db, user_id, _format_csv_row):
+        yield chunk
+
+@router.get("/moments/export")
+async def export_journal(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: UserResponse = Depends(get_current_user),
+    db = Depends(get_read_db)
+):
+    user_id = str(current_user.id)
+    if export_format == "csv":
+        body = _export_csv(db, user_id)
+        media_type = "text/csv"
+    else:
+        body = _export_records(db, user_id, _format_ndjson)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="journal.{export_format}"'}
+    )
\ No newline at end of file
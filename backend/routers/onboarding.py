@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
-from ..database import get_db
+from ..database import get_db, insert_document
 from ..models import AssessmentSubmit, AssessmentResponse, GoalSubmit, GoalResponse, UserResponse, VirtueScore
 from ..auth import get_current_user
+from ..rollups import record_assessment
+from ..profiles import invalidate_virtue_profile
+from ..latest_documents import latest_documents
+from ..profiling import ProfiledRoute
 from datetime import datetime, timezone
-import pymongo
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["onboarding"]
 )
 
@@ -55,8 +59,10 @@ async def submit_assessment(
         "created_at": datetime.now(timezone.utc)
     }
     
-    new_assessment = await db.assessments.insert_one(assessment_doc)
-    created_assessment = await db.assessments.find_one({"_id": new_assessment.inserted_id})
+    created_assessment = await insert_document(db.assessments, assessment_doc)
+    await record_assessment(db, assessment_doc["user_id"], assessment_doc["scores"], assessment_doc["created_at"])
+    await latest_documents.put("assessments", assessment_doc["user_id"], created_assessment)
+    invalidate_virtue_profile(assessment_doc["user_id"])
     
     return AssessmentResponse(**created_assessment)
 
@@ -65,10 +71,7 @@ async def get_assessment(
     current_user: UserResponse = Depends(get_current_user),
     db = Depends(get_db)
 ):
-    assessment = await db.assessments.find_one(
-        {"user_id": str(current_user.id)},
-        sort=[("_id", pymongo.DESCENDING)]
-    )
+    assessment = await latest_documents.get(db, "assessments", str(current_user.id))
     
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
@@ -88,8 +91,9 @@ async def submit_goals(
         "created_at": datetime.now(timezone.utc)
     }
     
-    new_goal = await db.goals.insert_one(goal_doc)
-    created_goal = await db.goals.find_one({"_id": new_goal.inserted_id})
+    created_goal = await insert_document(db.goals, goal_doc)
+    await latest_documents.put("goals", goal_doc["user_id"], created_goal)
+    invalidate_virtue_profile(goal_doc["user_id"])
     
     return GoalResponse(**created_goal)
 
@@ -98,10 +102,7 @@ async def get_goals(
     current_user: UserResponse = Depends(get_current_user),
     db = Depends(get_db)
 ):
-    goal = await db.goals.find_one(
-        {"user_id": str(current_user.id)},
-        sort=[("_id", pymongo.DESCENDING)]
-    )
+    goal = await latest_documents.get(db, "goals", str(current_user.id))
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goals not found")
@@ -4,13 +4,23 @@ Run script to start the FastAPI backend server.
 This script can be run from within the backend folder.
 
 Usage:
-    python run.py
+    python run.py                 # local development, with reload
+    python run.py --production    # multi-worker production server
     # or
     python -m uvicorn backend.main:app --reload
+
+Production mode (the default when PORT is set, as on Render) starts one
+uvicorn worker per available CPU (override with --workers or
+WEB_CONCURRENCY), on uvloop and httptools when they are installed. Each
+worker is a fresh process that builds its own MongoDB client in the app
+lifespan, so no connection is ever shared across processes.
 """
+import argparse
+import importlib.util
 import sys
 import os
 from pathlib import Path
+from typing import Optional
 
 # Add the parent directory to the Python path so backend package imports work
 backend_dir = Path(__file__).parent.absolute()
@@ -31,16 +41,99 @@ except ImportError:
     print("  pip install -r requirements.txt")
     sys.exit(1)
 
+# Seconds an idle keep-alive connection stays open. Longer than the idle
+# timeout of the proxy in front (Render's is 60s), so the proxy always
+# closes first and never reuses a connection uvicorn is tearing down.
+KEEP_ALIVE_SECONDS = 75
+# Time in-flight requests get to finish on SIGTERM during a deploy
+GRACEFUL_SHUTDOWN_SECONDS = 30
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """CPUs allowed by the container's cgroup quota, or None if unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>"
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: a quota of -1 means unlimited
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+def available_cpus() -> int:
+    # Honours CPU affinity (container CPU sets), unlike os.cpu_count()
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    # Platforms like Render cap CPU time with a cgroup quota instead, on
+    # hosts with many more cores; a fractional quota still gets one worker
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return cpus
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def run_production(host: str, port: int, workers: int, access_log: bool):
+    # Only reads settings; the workers build their own clients
+    from backend.config import settings
+
+    cpus = available_cpus()
+    # Workers inherit these environment variables. Split the argon2 threads
+    # between workers instead of giving every worker one per CPU
+    if settings.HASH_MAX_WORKERS is None:
+        os.environ["HASH_MAX_WORKERS"] = str(max(1, cpus // workers))
+    if workers > 1:
+        # Goal/assessment writes must reach the other workers' caches
+        if "CACHE_INVALIDATION_BUS" not in settings.model_fields_set:
+            os.environ["CACHE_INVALIDATION_BUS"] = "mongo"
+        if settings.STORAGE_BACKEND == "memory":
+            print("Warning: with STORAGE_BACKEND=memory every worker has its own, separate data.")
+        if settings.MOMENT_WRITE_BEHIND:
+            print("Warning: with MOMENT_WRITE_BEHIND a queued moment is only visible to GET /moments "
+                  "on the worker that queued it until it is flushed.")
+
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(f"Starting {workers} worker(s) on {host}:{port} ({cpus} CPUs, loop={loop}, http={http})")
+    uvicorn.run(
+        "backend.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+        # Behind the platform's proxy: trust its X-Forwarded-* headers
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        access_log=access_log,
+    )
+
 # Now run uvicorn
 if __name__ == "__main__":
     # Detect if we're running on Render (has PORT environment variable)
-    port = int(os.environ.get("PORT", 8000))
     is_render = "PORT" in os.environ
-    
-    if is_render:
-        # On Render, bind to 0.0.0.0 and use PORT, no reload in production
-        uvicorn.run("backend.main:app", host="0.0.0.0", port=port, reload=False)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--production", action="store_true", default=is_render, help="multi-worker server without reload")
+    parser.add_argument("--host", default="0.0.0.0" if is_render else "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 0)), help="defaults to one per CPU")
+    parser.add_argument("--access-log", action="store_true", help="log every request (production mode)")
+    args = parser.parse_args()
+
+    if args.production:
+        run_production(args.host, args.port, args.workers or available_cpus(), args.access_log)
     else:
         # Local development: use 127.0.0.1 for browser access, with reload
-        uvicorn.run("backend.main:app", host="127.0.0.1", port=8000, reload=True)
-
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, reload=True)
@@ -0,0 +1,256 @@
+import bisect
+import heapq
+import math
+from itertools import islice
+from operator import itemgetter
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Title matches count more than description matches
+FIELD_WEIGHTS = {"title": 2.0, "description": 1.0}
+# A full-word match beats a prefix match ("courage" vs "cour")
+PREFIX_MATCH_FACTOR = 0.5
+# Personalized ranking only considers this many of the newest articles per virtue
+VIRTUE_LIST_SIZE = 1000
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class ArticleIndex:
+    """
+    In-memory inverted index over articles.
+
+    Every query token must match (exactly or as a prefix) a token of the
+    title or description. Results are ranked by a tf-idf style score with
+    title matches weighted higher, and can be narrowed by virtue facets.
+    Articles can be added or removed one at a time, so the index can be kept
+    fresh incrementally.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self._articles: Dict[str, Dict[str, Any]] = {}
+        # Insertion order, used when there is no text query
+        self._order: Dict[str, int] = {}
+        self._next_position = 0
+        # token -> {article_id: field-weighted term frequency}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._article_tokens: Dict[str, Set[str]] = {}
+        self._by_virtue: Dict[str, Set[str]] = defaultdict(set)
+        # virtue -> newest-first article ids, see articles_for_virtue()
+        self._virtue_lists: Dict[str, List[str]] = {}
+        # Sorted vocabulary for prefix lookups, rebuilt lazily after changes
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self._articles
+
+    def get(self, article_id: str) -> Optional[Dict[str, Any]]:
+        return self._articles.get(article_id)
+
+    def build(self, articles: Iterable[Dict[str, Any]]) -> None:
+        self._reset()
+        for article in articles:
+            self.add(article)
+        for virtue in list(self._by_virtue):
+            self.articles_for_virtue(virtue)
+
+    def add(self, article: Dict[str, Any]) -> None:
+        article_id = article["id"]
+        if article_id in self._articles:
+            self.remove(article_id)
+
+        weights: Dict[str, float] = defaultdict(float)
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(article.get(field) or ""):
+                weights[token] += field_weight
+
+        for token, weight in weights.items():
+            self._postings[token][article_id] = weight
+        for virtue in article.get("virtues", []):
+            self._by_virtue[virtue].add(article_id)
+            # The new article is the newest one, so it goes to the front
+            ids = self._virtue_lists.get(virtue)
+            if ids is not None:
+                ids.insert(0, article_id)
+                del ids[VIRTUE_LIST_SIZE:]
+
+        self._articles[article_id] = article
+        self._article_tokens[article_id] = set(weights)
+        self._order[article_id] = self._next_position
+        self._next_position += 1
+        self._vocabulary_dirty = True
+
+    def remove(self, article_id: str) -> None:
+        article = self._articles.pop(article_id, None)
+        if article is None:
+            return
+        for token in self._article_tokens.pop(article_id):
+            postings = self._postings[token]
+            postings.pop(article_id, None)
+            if not postings:
+                del self._postings[token]
+        for virtue in article.get("virtues", []):
+            self._by_virtue[virtue].discard(article_id)
+            self._virtue_lists.pop(virtue, None)
+        del self._order[article_id]
+        self._vocabulary_dirty = True
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        # Vocabulary terms matching ``token``, with their match factor
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        matches = []
+        start = bisect.bisect_left(self._vocabulary, token)
+        for term in self._vocabulary[start:]:
+            if not term.startswith(token):
+                break
+            matches.append((term, 1.0 if term == token else PREFIX_MATCH_FACTOR))
+        return matches
+
+    def _candidates(self, virtues: Optional[List[str]]) -> Optional[Set[str]]:
+        if not virtues:
+            return None
+        candidates: Set[str] = set()
+        for virtue in virtues:
+            candidates |= self._by_virtue.get(virtue, set())
+        return candidates
+
+    def _text_scores(self, tokens: List[str], allowed: Optional[Set[str]]) -> Dict[str, float]:
+        # Expand every token first: one token without matches means no results
+        expansions = []
+        for token in dict.fromkeys(tokens):
+            terms = self._expand(token)
+            if not terms:
+                return {}
+            expansions.append(terms)
+        # Rarest token first, so later tokens only score surviving candidates
+        expansions.sort(key=lambda terms: sum(len(self._postings[t]) for t, _ in terms))
+
+        total_articles = len(self._articles)
+        scores: Optional[Dict[str, float]] = None
+        for terms in expansions:
+            token_scores: Dict[str, float] = {}
+            for term, factor in terms:
+                postings = self._postings[term]
+                scale = math.log(1 + total_articles / len(postings)) * factor
+                if scores is not None:
+                    # Only score articles that matched every previous token
+                    term_scores = {i: postings[i] * scale for i in scores if i in postings}
+                elif allowed is not None and len(allowed) < len(postings):
+                    term_scores = {i: postings[i] * scale for i in allowed if i in postings}
+                else:
+                    term_scores = {i: w * scale for i, w in postings.items()}
+                    if allowed is not None:
+                        term_scores = {i: s for i, s in term_scores.items() if i in allowed}
+                if not token_scores:
+                    token_scores = term_scores
+                else:
+                    for i, score in term_scores.items():
+                        if score > token_scores.get(i, 0.0):
+                            token_scores[i] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {i: s + token_scores[i] for i, s in scores.items() if i in token_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def _page(self, scores: Dict[str, float], limit: int, offset: int) -> Tuple[int, List[Dict[str, Any]]]:
+        # nlargest is stable, and scores are in insertion order, so ties
+        # keep the articles' original order
+        page = heapq.nlargest(offset + limit, scores.items(), key=itemgetter(1))
+        return len(scores), [self._articles[i] for i, _ in page[offset:]]
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        virtues: Optional[List[str]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Returns (total number of matches, requested page of articles)."""
+        allowed = self._candidates(virtues)
+        tokens = tokenize(query or "")
+
+        if not tokens:
+            ids = allowed if allowed is not None else self._articles.keys()
+            ranked = sorted(ids, key=self._order.__getitem__)
+            return len(ranked), [self._articles[i] for i in ranked[offset:offset + limit]]
+
+        return self._page(self._text_scores(tokens, allowed), limit, offset)
+
+    def articles_for_virtue(self, virtue: str) -> List[str]:
+        """Newest article ids tagged with ``virtue``, capped per virtue."""
+        ids = self._virtue_lists.get(virtue)
+        if ids is None:
+            tagged = self._by_virtue.get(virtue, ())
+            ids = sorted(tagged, key=self._order.__getitem__, reverse=True)[:VIRTUE_LIST_SIZE]
+            self._virtue_lists[virtue] = ids
+        return ids
+
+    def personalized(
+        self,
+        virtue_weights: Dict[str, float],
+        query: Optional[str] = None,
+        virtues: Optional[List[str]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Ranks articles by how strongly their virtues overlap the weighted
+        virtue profile. Without a text query the ranked part comes from
+        merging the profile's per-virtue lists, so its cost depends on those
+        few short lists, not on the size of the index; other articles follow
+        in their usual order. With a query, text relevance is boosted by the
+        profile overlap.
+        """
+        if not virtue_weights:
+            return self.search(query, virtues, limit, offset)
+
+        allowed = self._candidates(virtues)
+        tokens = tokenize(query or "")
+
+        if tokens:
+            scores = self._text_scores(tokens, allowed)
+            for article_id in scores:
+                boost = sum(virtue_weights.get(v, 0.0) for v in self._articles[article_id].get("virtues", []))
+                scores[article_id] *= 1.0 + boost
+            return self._page(scores, limit, offset)
+
+        scores: Dict[str, float] = {}
+        for virtue, weight in virtue_weights.items():
+            for article_id in self.articles_for_virtue(virtue):
+                if allowed is None or article_id in allowed:
+                    scores[article_id] = scores.get(article_id, 0.0) + weight
+        # Within equal scores prefer newer articles
+        ordered = dict(sorted(scores.items(), key=lambda item: -self._order[item[0]]))
+        _, page = self._page(ordered, limit, offset)
+
+        # Articles outside the profile follow in their usual order, so the
+        # personalized feed reorders the news rather than hiding any of it
+        total = len(allowed) if allowed is not None else len(self._articles)
+        missing = offset + limit - len(ordered)
+        if missing > 0:
+            skip = max(0, offset - len(ordered))
+            if allowed is None:
+                # _order is kept in insertion order, so the walk stops after
+                # at most offset + limit + len(ordered) articles
+                rest = (i for i in self._order if i not in ordered)
+            else:
+                # Only the facet's articles, as search() does without a query
+                rest = iter(sorted((i for i in allowed if i not in ordered), key=self._order.__getitem__))
+            page += [self._articles[i] for i in islice(rest, skip, skip + min(missing, limit))]
+        return total, page
@@ -0,0 +1,57 @@
+"""
+Fast JSON responses.
+
+``FastJSONResponse`` renders with orjson. It is not the app's default
+response class: endpoints opt in by returning one. Those returning large
+lists read from our own collections can also skip Pydantic entirely with
+``trusted_documents``: the documents were written by this API, so their
+types already match the response model and only need the model's fields
+picked out; ObjectIds and datetimes are encoded by orjson directly.
+FastAPI sends a returned ``FastJSONResponse`` as is, without validating it
+against ``response_model`` (still used for the OpenAPI schema).
+"""
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# UTC datetimes as "...Z", the way Pydantic writes them
+JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=JSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+_model_fields: Dict[type, List[Tuple[str, Any]]] = {}
+
+def _fields_of(model: Type[BaseModel]) -> List[Tuple[str, Any]]:
+    # (document key, default) per field; the alias is both the stored and
+    # the serialized name (responses are rendered by alias)
+    fields = _model_fields.get(model)
+    if fields is None:
+        fields = []
+        for name, field in model.model_fields.items():
+            default = None if field.default is PydanticUndefined else field.default
+            fields.append((field.alias or name, default))
+        _model_fields[model] = fields
+    return fields
+
+def trusted_documents(model: Type[BaseModel], documents: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The fields of ``model`` from documents this API wrote, without validation."""
+    fields = _fields_of(model)
+    return [{key: document.get(key, default) for key, default in fields} for document in documents]
@@ -0,0 +1,170 @@
+"""
+Slow MongoDB command log.
+
+Commands slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with their
+collection, duration, the route that issued them and the shape of the
+command with every literal value replaced by ``"?"``, so user data never
+reaches the logs.
+
+Slow ``find`` and ``aggregate`` commands are also explained (query planner
+verbosity) on a background thread, at most once per collection and shape
+every ``SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS``, and the winning plan is
+logged with a warning when it contains a ``COLLSCAN``.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import current_request_scope, route_template
+
+logger = logging.getLogger(__name__)
+
+EXPLAINED_COMMANDS = ("find", "aggregate")
+
+# Driver bookkeeping that says nothing about the query itself
+IGNORED_FIELDS = {
+    "lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "readConcern",
+    "writeConcern", "startTransaction", "autocommit", "apiVersion", "comment",
+}
+
+# Sort orders and projections are part of the shape, not user data
+KEPT_FIELDS = {"sort", "$sort", "projection", "hint"}
+
+# Pages of inserted documents are summarized by their count
+COUNTED_FIELDS = {"documents"}
+
+# Commands that are never worth logging
+SKIPPED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "explain", "endSessions", "saslStart", "saslContinue"}
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: (inner if key in KEPT_FIELDS else redact(inner))
+            for key, inner in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [redact(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+def command_shape(command_name: str, command: dict) -> Dict[str, Any]:
+    shape = {}
+    for key, value in command.items():
+        if key == command_name or key in IGNORED_FIELDS:
+            continue
+        if key in COUNTED_FIELDS:
+            shape[key] = len(value)
+        elif key in KEPT_FIELDS:
+            shape[key] = value
+        else:
+            shape[key] = redact(value)
+    return shape
+
+def plan_stages(plan: Any) -> List[str]:
+    """Stage names found anywhere in an explain document, e.g. IXSCAN(user_timestamp)."""
+    stages = []
+    if isinstance(plan, dict):
+        stage = plan.get("stage")
+        if isinstance(stage, str):
+            index = plan.get("indexName")
+            stages.append(f"{stage}({index})" if index else stage)
+        for key, value in plan.items():
+            if key != "rejectedPlans":
+                stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+class SlowQueryListener(monitoring.CommandListener):
+    def __init__(self, threshold_ms: Optional[float], explain: bool, explain_interval: float):
+        self.threshold = threshold_ms / 1000 if threshold_ms else None
+        self.explain = explain
+        # (collection, shape) pairs explained recently. Listener callbacks run
+        # on Motor's executor threads and TTLCache is not thread-safe
+        self._explained = TTLCache(maxsize=1000, ttl=explain_interval)
+        self._explained_lock = threading.Lock()
+        # (connection, request_id) -> (collection, command), filled in by started()
+        self._commands: Dict[tuple, tuple] = {}
+        self._client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def attach(self, client) -> None:
+        """The synchronous pymongo client explain plans are requested through."""
+        self._client = client
+
+    def started(self, event):
+        if self.threshold is None or event.command_name in SKIPPED_COMMANDS:
+            return
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        self._commands[(event.connection_id, event.request_id)] = (collection, event.command)
+
+    def _record(self, event, outcome):
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration = event.duration_micros / 1e6
+        if duration < self.threshold:
+            return
+
+        collection, command = started
+        scope = current_request_scope.get()
+        route = f"{scope['method']} {route_template(scope)}" if scope else "-"
+        shape = json.dumps(command_shape(event.command_name, command), default=str, sort_keys=True)
+        logger.warning(
+            "Slow MongoDB %s on %s took %.1fms (%s, route %s): %s",
+            event.command_name, collection, duration * 1000, outcome, route, shape,
+        )
+
+        if self.explain and self._client is not None and event.command_name in EXPLAINED_COMMANDS:
+            key = (collection, shape)
+            with self._explained_lock:
+                seen = key in self._explained
+                if not seen:
+                    self._explained.set(key, True)
+            if not seen:
+                self._explain_in_background(event.database_name, event.command_name, collection, command, shape)
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _explain_in_background(self, database: str, command_name: str, collection: str, command: dict, shape: str):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        explained = {key: value for key, value in command.items() if key not in IGNORED_FIELDS}
+        self._executor.submit(self._explain, database, command_name, collection, explained, shape)
+
+    def _explain(self, database: str, command_name: str, collection: str, command: dict, shape: str):
+        try:
+            result = self._client[database].command("explain", command, verbosity="queryPlanner")
+        except Exception as e:
+            logger.info("Could not explain slow %s on %s: %s", command_name, collection, e)
+            return
+        stages = plan_stages(result.get("queryPlanner", result))
+        level = logging.WARNING if any(stage.startswith("COLLSCAN") for stage in stages) else logging.INFO
+        logger.log(level, "Plan for slow %s on %s %s: %s", command_name, collection, shape, " > ".join(stages) or "unknown")
+        logger.debug("Full explain for slow %s on %s: %s", command_name, collection, json.dumps(result, default=str))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+slow_query_listener = SlowQueryListener(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_EXPLAIN,
+    settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+)
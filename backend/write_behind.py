@@ -0,0 +1,183 @@
+"""
+Write-behind buffering for POST /moments (``MOMENT_WRITE_BEHIND=true``).
+
+Moments get their ObjectId up front, are acknowledged as soon as they are
+queued, and a background task writes the queue with unordered
+``insert_many`` calls of up to ``MOMENT_WRITE_BEHIND_BATCH_SIZE`` documents,
+at most ``MOMENT_WRITE_BEHIND_MAX_DELAY_SECONDS`` after the first one was
+queued. The weekly rollups of a batch go out as one bulk write.
+
+* Back-pressure: once ``MOMENT_WRITE_BEHIND_MAX_PENDING`` moments are
+  waiting, new ones wait for room for up to
+  ``MOMENT_WRITE_BEHIND_MAX_WAIT_SECONDS`` and are then refused with 503.
+* Read-your-writes: ``GET /moments`` merges in the user's moments that are
+  still queued in the same worker. Other reads (dashboard, reflection,
+  export), and ``GET /moments`` answered by another uvicorn worker, see them
+  after the flush, up to ``MOMENT_WRITE_BEHIND_MAX_DELAY_SECONDS`` later.
+* Shutdown: the lifespan flushes whatever is queued before the MongoDB
+  client closes. Moments still queued when the process dies are lost, which
+  is the trade-off this mode makes.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from .config import settings
+from .metrics import (
+    moment_buffer_depth, moment_buffer_dropped, moment_buffer_flush_duration,
+    moment_buffer_rejected, moment_buffer_written
+)
+from .rollups import record_moments
+
+logger = logging.getLogger(__name__)
+
+# Write error code of a document already inserted by an earlier attempt
+DUPLICATE_KEY = 11000
+FLUSH_ATTEMPTS = 3
+
+class WriteBehindFull(Exception):
+    """Raised when the queue stayed full for the whole wait."""
+
+class WriteBehindBuffer:
+    def __init__(self, batch_size: int, max_delay: float, max_pending: int, max_wait: float):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self._db = None
+        self._queue: List[dict] = []
+        # Queued and in-flight moments per user, for read-your-writes
+        self._pending: Dict[str, Dict[object, dict]] = defaultdict(dict)
+        self._pending_count = 0
+        self._queued = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._room = asyncio.Condition()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db) -> None:
+        self._db = db
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, moment: dict) -> None:
+        """Queues a moment that already carries its ``_id``."""
+        if self._pending_count >= self.max_pending:
+            async with self._room:
+                try:
+                    await asyncio.wait_for(
+                        self._room.wait_for(lambda: self._pending_count < self.max_pending),
+                        self.max_wait
+                    )
+                except asyncio.TimeoutError:
+                    moment_buffer_rejected.inc()
+                    raise WriteBehindFull()
+
+        self._queue.append(moment)
+        self._pending[moment["user_id"]][moment["_id"]] = moment
+        self._pending_count += 1
+        moment_buffer_depth.inc()
+        self._queued.set()
+        if len(self._queue) >= self.batch_size:
+            self._batch_full.set()
+
+    def pending_for(self, user_id: str) -> List[dict]:
+        """The user's moments that may not be readable from MongoDB yet."""
+        pending = self._pending.get(user_id)
+        return list(pending.values()) if pending else []
+
+    async def _run(self):
+        while not (self._closing and not self._queue):
+            await self._queued.wait()
+            # Give the batch up to max_delay to fill, unless it already has
+            if len(self._queue) < self.batch_size and not self._closing:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self._flush_batch()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+
+    async def _flush_batch(self):
+        batch = self._queue[:self.batch_size]
+        del self._queue[:self.batch_size]
+        if len(self._queue) < self.batch_size:
+            self._batch_full.clear()
+        if not self._queue:
+            self._queued.clear()
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        written: List[dict] = []
+        try:
+            written = await self._insert(batch)
+            try:
+                await record_moments(self._db, written)
+            except Exception:
+                # The moments are stored; the rollups can be rebuilt from them
+                logger.exception("Rollup update for %d buffered moments failed", len(written))
+            moment_buffer_flush_duration.observe(time.perf_counter() - start)
+        finally:
+            # Whatever happened, the batch has left the queue: release its
+            # room and stop merging it into reads
+            moment_buffer_written.inc(amount=len(written))
+            if len(written) < len(batch):
+                moment_buffer_dropped.inc(amount=len(batch) - len(written))
+            for moment in batch:
+                user_pending = self._pending.get(moment["user_id"])
+                if user_pending is not None:
+                    user_pending.pop(moment["_id"], None)
+                    if not user_pending:
+                        del self._pending[moment["user_id"]]
+            self._pending_count -= len(batch)
+            moment_buffer_depth.dec(amount=len(batch))
+            async with self._room:
+                self._room.notify_all()
+
+    async def _insert(self, batch: List[dict]) -> List[dict]:
+        """Inserts the batch, retrying transient failures; returns what got stored."""
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                await self._db.moments.insert_many(batch, ordered=False)
+                return batch
+            except BulkWriteError as e:
+                # Duplicates were stored by an earlier attempt; anything else
+                # was rejected by the server and retrying will not help
+                rejected = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY
+                }
+                if rejected:
+                    logger.error("Dropped %d buffered moments rejected by MongoDB", len(rejected))
+                return [moment for index, moment in enumerate(batch) if index not in rejected]
+            except PyMongoError:
+                if attempt == FLUSH_ATTEMPTS:
+                    logger.exception("Dropped %d buffered moments after %d attempts", len(batch), attempt)
+                    return []
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        return []
+
+    async def close(self) -> None:
+        """Flushes everything still queued, then stops the background task."""
+        self._closing = True
+        self._queued.set()
+        self._batch_full.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+moment_writer: Optional[WriteBehindBuffer] = None
+if settings.MOMENT_WRITE_BEHIND:
+    moment_writer = WriteBehindBuffer(
+        batch_size=settings.MOMENT_WRITE_BEHIND_BATCH_SIZE,
+        max_delay=settings.MOMENT_WRITE_BEHIND_MAX_DELAY_SECONDS,
+        max_pending=settings.MOMENT_WRITE_BEHIND_MAX_PENDING,
+        max_wait=settings.MOMENT_WRITE_BEHIND_MAX_WAIT_SECONDS
+    )
@@ -32,8 +32,8 @@ const LoggedMomentsDisplay: React.FC<LoggedMomentsDisplayProps> = ({ refreshTrig
 
         if (response.ok) {
           const data = await response.json();
-          // Map backend response to CharacterMoment type
-          const mappedMoments: CharacterMoment[] = data.map((m: any) => ({
+          // Map backend response (newest page of moments) to CharacterMoment type
+          const mappedMoments: CharacterMoment[] = data.items.map((m: any) => ({
             id: m.id || m._id,
             timestamp: m.timestamp,
             moment: m.content,
@@ -48,7 +48,7 @@ const VirtueTrendChart: React.FC<VirtueTrendChartProps> = ({ initialVirtueScores
     <Card className="w-full">
       <CardHeader>
         <CardTitle>Your Character Growth Trend</CardTitle>
-        <CardDescription>Simulated progress of your virtue scores over the last few weeks.</CardDescription>
+        <CardDescription>Progress of your virtue scores over the last few weeks.</CardDescription>
       </CardHeader>
       <CardContent>
         <ResponsiveContainer width="100%" height={400}>
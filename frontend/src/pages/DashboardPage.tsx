@@ -20,11 +20,7 @@ const DashboardPage: React.FC = () => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [stats, assessment, goals] = await Promise.all([
-          api.getDashboardStats(),
-          api.getAssessment(),
-          api.getGoals()
-        ]);
+        const { stats, assessment, goals } = await api.getDashboardBootstrap();
         
         setDashboardStats(stats);
         setAssessmentData(assessment);
@@ -55,6 +55,12 @@ export interface NewsArticle {
   imageUrl?: string;
 }
 
+export interface DashboardBootstrap {
+  stats: DashboardStats;
+  goals: GoalResponse | null;
+  assessment: AssessmentResponse | null;
+}
+
 export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000/api/v1";
 
 const getAuthHeaders = () => {
@@ -87,6 +93,14 @@ export const api = {
     return handleResponse(response);
   },
 
+  getDashboardBootstrap: async (): Promise<DashboardBootstrap> => {
+    const response = await fetch(`${API_BASE_URL}/dashboard/bootstrap`, {
+      method: "GET",
+      headers: getAuthHeaders(),
+    });
+    return handleResponse(response);
+  },
+
   getWeeklyReflection: async (): Promise<WeeklyReflection> => {
     const response = await fetch(`${API_BASE_URL}/reflection/weekly`, {
       method: "GET",
@@ -130,6 +144,8 @@ export const api = {
 
   getNewsArticles: async (query?: string): Promise<NewsArticle[]> => {
     const url = new URL(`${API_BASE_URL}/news`);
+    // Rank by the user's priority and weakest virtues
+    url.searchParams.append("rank", "personal");
     if (query) {
       url.searchParams.append("q", query);
     }
@@ -0,0 +1,96 @@
+"""
+Benchmarks GET /moments/export against a synthetic user with many moments.
+
+Seeds the user directly through backend.database (MONGODB_URI must point at
+the same database as the server), then streams the export from a live server:
+
+    python -m scripts.bench_export --moments 100000 --format ndjson
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from backend.auth import get_password_hash
+from backend.database import get_db
+from backend.routers.moments import VIRTUE_FEEDBACK
+
+BASE_URL = "http://localhost:8000/api/v1"
+AUTH_URL = f"{BASE_URL}/auth"
+PASSWORD = "benchpassword123"
+
+async def seed_user(db, moment_count: int, batch_size: int = 5000) -> str:
+    email = f"bench_export_{uuid.uuid4().hex[:8]}@example.com"
+    result = await db.users.insert_one({
+        "email": email,
+        "hashed_password": get_password_hash(PASSWORD),
+        "name": "Export Bench"
+    })
+    user_id = str(result.inserted_id)
+
+    virtues = list(VIRTUE_FEEDBACK)
+    start = datetime.now(timezone.utc) - timedelta(days=365 * 3)
+    step = timedelta(days=365 * 3) / max(moment_count, 1)
+    batch = []
+    for i in range(moment_count):
+        virtue = random.choice(virtues)
+        batch.append({
+            "user_id": user_id,
+            "content": f"Synthetic moment {i} practicing {virtue}. " * 4,
+            "virtue_id": virtue,
+            "feedback": VIRTUE_FEEDBACK[virtue],
+            "timestamp": start + step * i
+        })
+        if len(batch) >= batch_size:
+            await db.moments.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.moments.insert_many(batch, ordered=False)
+    return email
+
+async def stream_export(client, headers, export_format: str):
+    start = time.perf_counter()
+    first_byte = None
+    total_bytes = 0
+    lines = 0
+    async with client.stream(
+        "GET", f"{BASE_URL}/moments/export",
+        params={"format": export_format}, headers=headers
+    ) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            total_bytes += len(chunk)
+            lines += chunk.count(b"\n")
+    return time.perf_counter() - start, first_byte or 0.0, total_bytes, lines
+
+async def run(args):
+    db = await get_db()
+    print(f"Seeding {args.moments} moments...")
+    seed_start = time.perf_counter()
+    email = await seed_user(db, args.moments)
+    print(f"Seeded in {time.perf_counter() - seed_start:.1f}s")
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        response = await client.post(f"{AUTH_URL}/login", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+        elapsed, first_byte, total_bytes, lines = await stream_export(client, headers, args.format)
+
+    print(f"format:          {args.format}")
+    print(f"records:         {lines}")
+    print(f"bytes:           {total_bytes / 1e6:.1f} MB")
+    print(f"time to 1st byte {first_byte * 1000:.0f} ms")
+    print(f"total time:      {elapsed:.2f} s ({lines / elapsed:,.0f} records/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moments", type=int, default=100_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,214 @@
+"""
+Concurrent user-journey load test.
+
+Boots the app in-process (lifespan included, no server needed) against the
+database configured by MONGODB_URI and runs many simulated users at once,
+each walking the path a new user takes through the app:
+
+    signup -> assessment -> goals -> moments -> moment list -> dashboard
+    -> weekly reflection -> challenges -> complete a challenge -> news
+
+Every request is timed and the MongoDB commands it issued are counted, then
+throughput and p50/p95/p99 latency per endpoint are written as JSON so two
+commits can be compared:
+
+    python -m scripts.bench_journeys --users 50 --journeys 4 --output before.json
+    git checkout <other commit>
+    python -m scripts.bench_journeys --users 50 --journeys 4 --output after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+# The command list of the request currently being measured. The app serves
+# each request inside the calling task and Motor runs driver calls with a
+# copy of its context, so commands are attributed to the right request even
+# with hundreds of journeys in flight.
+current_commands: ContextVar = ContextVar("current_commands", default=None)
+
+class CommandCounter(monitoring.CommandListener):
+    def started(self, event):
+        commands = current_commands.get()
+        if commands is not None:
+            commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Must be registered before the Motor client is created
+monitoring.register(CommandCounter())
+
+import httpx
+
+from backend.main import app
+
+VIRTUES = ["courage", "empathy", "curiosity", "resilience", "integrity", "creativity"]
+MOMENT_TEXTS = [
+    "Spoke up in standup about the deadline",
+    "Paired with a new teammate on a tricky bug",
+    "Tried a different approach after the first one failed",
+    "Asked the customer why before building what they asked for",
+]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(lambda: {"latency": [], "ops": [], "errors": 0})
+
+    async def request(self, client, name, method, url, **kwargs):
+        commands = []
+        token = current_commands.set(commands)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        finally:
+            current_commands.reset(token)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        sample = self.samples[name]
+        sample["latency"].append(elapsed)
+        sample["ops"].append(len(commands))
+        if response.status_code >= 400:
+            sample["errors"] += 1
+        return response
+
+    def summary(self):
+        endpoints = {}
+        for name, sample in sorted(self.samples.items()):
+            latency = sample["latency"]
+            endpoints[name] = {
+                "requests": len(latency),
+                "errors": sample["errors"],
+                "mean_ms": round(sum(latency) / len(latency), 2),
+                "p50_ms": round(percentile(latency, 50), 2),
+                "p95_ms": round(percentile(latency, 95), 2),
+                "p99_ms": round(percentile(latency, 99), 2),
+                "mongo_ops_per_request": round(sum(sample["ops"]) / len(sample["ops"]), 2),
+            }
+        return endpoints
+
+async def journey(client, recorder, moments_per_journey):
+    # 1. Account and onboarding
+    email = f"bench_journey_{uuid.uuid4().hex[:12]}@example.com"
+    response = await recorder.request(client, "POST /auth/signup", "POST", "/auth/signup", json={
+        "email": email, "password": "benchpassword123", "name": "Bench"
+    })
+    if response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    await recorder.request(client, "POST /assessment", "POST", "/assessment", headers=headers, json={
+        "answers": {f"q{i}": random.randint(1, 5) for i in range(1, 11)}
+    })
+    await recorder.request(client, "POST /goals", "POST", "/goals", headers=headers, json={
+        "priority_virtues": random.sample(VIRTUES, 2), "innovation_goal": "Lead a new project"
+    })
+
+    # 2. Logging moments
+    for _ in range(moments_per_journey):
+        await recorder.request(client, "POST /moments", "POST", "/moments", headers=headers, json={
+            "content": random.choice(MOMENT_TEXTS), "virtue_id": random.choice(VIRTUES)
+        })
+    await recorder.request(client, "GET /moments", "GET", "/moments", headers=headers)
+
+    # 3. Reviewing progress
+    await recorder.request(client, "GET /dashboard/stats", "GET", "/dashboard/stats", headers=headers)
+    await recorder.request(client, "GET /reflection/weekly", "GET", "/reflection/weekly", headers=headers)
+
+    # 4. Challenges and news
+    response = await recorder.request(client, "GET /challenges", "GET", "/challenges", headers=headers)
+    if response.status_code == 200 and response.json():
+        challenge_id = response.json()[0]["_id"]
+        await recorder.request(
+            client, "PATCH /challenges/{challenge_id}", "PATCH", f"/challenges/{challenge_id}",
+            headers=headers, json={"status": "completed"}
+        )
+    await recorder.request(client, "GET /news", "GET", "/news", headers=headers)
+
+async def simulated_user(client, recorder, journeys, moments_per_journey):
+    for _ in range(journeys):
+        await journey(client, recorder, moments_per_journey)
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report, baseline=None):
+    base_endpoints = baseline["endpoints"] if baseline else {}
+    print(f"{report['requests']} requests in {report['duration_s']:.1f}s, {report['throughput_rps']:.1f} req/s", end="")
+    if baseline:
+        change = (report["throughput_rps"] / baseline["throughput_rps"] - 1) * 100
+        print(f" ({change:+.1f}% vs {baseline.get('commit') or 'baseline'})", end="")
+    print()
+    print(f"{'endpoint':<34} {'reqs':>6} {'err':>4} {'ops':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'p95 vs base':>12}")
+    for name, stats in report["endpoints"].items():
+        delta = ""
+        if name in base_endpoints and base_endpoints[name]["p95_ms"]:
+            delta = f"{(stats['p95_ms'] / base_endpoints[name]['p95_ms'] - 1) * 100:+.1f}%"
+        print(
+            f"{name:<34} {stats['requests']:>6} {stats['errors']:>4} {stats['mongo_ops_per_request']:>5.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {delta:>12}"
+        )
+
+async def run(args):
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1", timeout=60) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                simulated_user(client, recorder, args.journeys, args.moments)
+                for _ in range(args.users)
+            ))
+            duration = time.perf_counter() - start
+
+    endpoints = recorder.summary()
+    total = sum(stats["requests"] for stats in endpoints.values())
+    report = {
+        "commit": current_commit(),
+        "users": args.users,
+        "journeys_per_user": args.journeys,
+        "moments_per_journey": args.moments,
+        "duration_s": round(duration, 3),
+        "requests": total,
+        "errors": sum(stats["errors"] for stats in endpoints.values()),
+        "throughput_rps": round(total / duration, 2),
+        "endpoints": endpoints,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--journeys", type=int, default=3, help="journeys each user runs back to back")
+    parser.add_argument("--moments", type=int, default=5, help="moments logged per journey")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report from another commit to compare against")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+Measures /dashboard/stats latency while the server is flooded with logins.
+
+Run it against a live server once on the old code and once on the new code
+to compare how much a login storm hurts unrelated requests:
+
+    python -m scripts.bench_login_flood --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+BASE_URL = "http://localhost:8000/api/v1"
+AUTH_URL = f"{BASE_URL}/auth"
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(name, samples):
+    print(
+        f"{name:<24} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):7.1f}ms "
+        f"p95={percentile(samples, 95):7.1f}ms "
+        f"p99={percentile(samples, 99):7.1f}ms "
+        f"max={max(samples, default=0):7.1f}ms"
+    )
+
+async def probe_dashboard(client, headers, stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"{BASE_URL}/dashboard/stats", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+async def login_worker(client, credentials, remaining, statuses):
+    while remaining:
+        remaining.pop()
+        response = await client.post(f"{AUTH_URL}/login", data=credentials)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+async def run(args):
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    password = "benchpassword123"
+    async with httpx.AsyncClient(timeout=60) as client:
+        response = await client.post(
+            f"{AUTH_URL}/signup",
+            json={"email": email, "password": password, "name": "Bench User"}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+        # 1. Baseline: dashboard alone
+        stop = asyncio.Event()
+        baseline = []
+        probe = asyncio.create_task(probe_dashboard(client, headers, stop, baseline))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        await probe
+
+        # 2. Dashboard while logins flood the server
+        stop = asyncio.Event()
+        flooded = []
+        statuses = {}
+        remaining = list(range(args.logins))
+        credentials = {"username": email, "password": password}
+        probe = asyncio.create_task(probe_dashboard(client, headers, stop, flooded))
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            login_worker(client, credentials, remaining, statuses)
+            for _ in range(args.concurrency)
+        ])
+        flood_seconds = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    summarize("dashboard (idle)", baseline)
+    summarize("dashboard (login flood)", flooded)
+    print(f"logins: {args.logins} in {flood_seconds:.2f}s, status codes: {statuses}")
+    if baseline and flooded:
+        print(f"mean slowdown: {statistics.mean(flooded) / statistics.mean(baseline):.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,127 @@
+"""
+POST /moments throughput with and without write-behind buffering.
+
+Boots the app in-process (lifespan included) once with
+MOMENT_WRITE_BEHIND=false and once with it on, each time against the
+database configured by MONGODB_URI (or STORAGE_BACKEND=memory), signs up
+--users users and has them all log --moments moments concurrently. Reports
+acknowledged moments per second and request latency for both modes, and
+checks after the final flush that every acknowledged moment, and its rollup
+increment, was stored:
+
+    python -m scripts.bench_moment_writes --users 50 --moments 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+VIRTUES = ["courage", "empathy", "curiosity", "resilience", "integrity", "creativity"]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def run_single(args):
+    import httpx
+
+    from backend.database import get_db
+    from backend.main import app
+    from backend.rollups import ROLLUPS_COLLECTION
+    from backend.write_behind import moment_writer
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1", timeout=60) as client:
+            tokens = []
+            for _ in range(args.users):
+                response = await client.post("/auth/signup", json={
+                    "email": f"bench_writes_{uuid.uuid4().hex[:12]}@example.com",
+                    "password": "benchpassword123",
+                    "name": "Bench",
+                })
+                response.raise_for_status()
+                tokens.append(response.json())
+
+            latencies, errors = [], 0
+
+            async def log_moments(token):
+                nonlocal errors
+                headers = {"Authorization": f"Bearer {token}"}
+                for i in range(args.moments):
+                    start = time.perf_counter()
+                    response = await client.post("/moments", headers=headers, json={
+                        "content": f"Bench moment {i}", "virtue_id": random.choice(VIRTUES)
+                    })
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(log_moments(t["token"]) for t in tokens))
+            acknowledged = time.perf_counter() - started
+            if moment_writer is not None:
+                await moment_writer.close()
+            stored_in = time.perf_counter() - started
+
+            db = await get_db()
+            user_ids = [t["user"]["_id"] for t in tokens]
+            stored = await db.moments.count_documents({"user_id": {"$in": user_ids}})
+            rolled_up = 0
+            async for rollup in db[ROLLUPS_COLLECTION].find({"user_id": {"$in": user_ids}}):
+                rolled_up += rollup.get("moment_count", 0)
+
+    total = args.users * args.moments
+    return {
+        "write_behind": moment_writer is not None,
+        "moments": total,
+        "errors": errors,
+        "acknowledged_per_s": round(total / acknowledged, 1),
+        "stored_per_s": round(total / stored_in, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "stored": stored,
+        "rolled_up": rolled_up,
+    }
+
+def run_mode(write_behind: bool, args) -> dict:
+    env = dict(os.environ, MOMENT_WRITE_BEHIND=str(write_behind).lower())
+    output = subprocess.run(
+        [sys.executable, "-m", "scripts.bench_moment_writes", "--single",
+         "--users", str(args.users), "--moments", str(args.moments)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(args):
+    if args.single:
+        print(json.dumps(asyncio.run(run_single(args))))
+        return
+
+    runs = [run_mode(False, args), run_mode(True, args)]
+    print(f"{args.users} users x {args.moments} moments")
+    print(f"{'mode':<14} {'acked/s':>10} {'stored/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'stored':>8} {'rolled up':>10}")
+    for run in runs:
+        mode = "write-behind" if run["write_behind"] else "direct"
+        print(
+            f"{mode:<14} {run['acknowledged_per_s']:>10.1f} {run['stored_per_s']:>10.1f} {run['p50_ms']:>8.1f} "
+            f"{run['p99_ms']:>8.1f} {run['errors']:>7} {run['stored']:>8} {run['rolled_up']:>10}"
+        )
+    print(f"stored moments/s: {runs[1]['stored_per_s'] / runs[0]['stored_per_s']:.2f}x with write-behind")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(runs, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="concurrent users")
+    parser.add_argument("--moments", type=int, default=100, help="moments logged per user")
+    parser.add_argument("--output", help="write the JSON results here")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    main(parser.parse_args())
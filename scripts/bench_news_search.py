@@ -0,0 +1,83 @@
+"""
+Benchmarks the news search index against the old linear substring scan.
+
+Runs fully in-process on synthetic articles, no server or database needed:
+
+    python -m scripts.bench_news_search --sizes 10000 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from backend.search import ArticleIndex
+from backend.routers.external import VIRTUE_NAMES
+
+# Common words show up in a large share of articles; the synthetic long tail
+# gives a realistic, Zipf-like vocabulary on top of them.
+COMMON_WORDS = (
+    "team leader community startup founder research discovery customer market "
+    "project volunteer storm rebuild pivot failure growth learning listening "
+    "feedback mentor student teacher nurse engineer city school hospital river "
+    "climate science medicine product design support change justice equality"
+).split()
+TAIL_WORDS = [f"{a}{b}{c}" for a in ("bra", "cel", "dor", "fen", "gul", "hox") for b in ("ami", "eto", "iru", "oka", "uze") for c in range(200)]
+WORDS = COMMON_WORDS + TAIL_WORDS
+WORD_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+
+QUERIES = ["resilience", "team", "comm", "startup founder", "celeto1", "dor", "courage activist", "zzz"]
+
+def make_articles(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    virtues = list(VIRTUE_NAMES)
+    articles = []
+    for i in range(count):
+        chosen = rng.sample(virtues, 2)
+        words = rng.choices(WORDS, weights=WORD_WEIGHTS, k=6)
+        articles.append({
+            "id": f"a{i}",
+            "title": f"{VIRTUE_NAMES[chosen[0]]} {' '.join(words[:3])} story {i}",
+            "description": f"A tale of {chosen[1]} and {' '.join(words[3:])}.",
+            "url": f"https://example.com/news/{i}",
+            "virtues": chosen,
+            "imageUrl": None,
+        })
+    return articles
+
+def linear_scan(articles, q):
+    query = q.lower()
+    return [
+        a for a in articles
+        if query in a["title"].lower() or query in a["description"].lower()
+    ]
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+def run(args):
+    for size in args.sizes:
+        articles = make_articles(size)
+        index = ArticleIndex()
+        start = time.perf_counter()
+        index.build(articles)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"\n{size:,} articles (index build {build_ms:.0f} ms)")
+        print(f"{'query':<20} {'matches':>8} {'index p50':>10} {'scan p50':>10}")
+        for q in QUERIES:
+            total, _ = index.search(q, limit=20)
+            index_p50, _ = time_ms(lambda: index.search(q, limit=20), args.repeat)
+            scan_p50, _ = time_ms(lambda: linear_scan(articles, q), max(1, args.repeat // 10))
+            print(f"{q:<20} {total:>8} {index_p50:>8.2f}ms {scan_p50:>8.2f}ms")
+        faceted_p50, _ = time_ms(lambda: index.search("team", virtues=["courage"], limit=20), args.repeat)
+        print(f"{'team + courage facet':<20} {'':>8} {faceted_p50:>8.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    run(parser.parse_args())
@@ -0,0 +1,102 @@
+"""
+Microbenchmark of response serialization for a page of moments.
+
+Serves the same 10k moment documents through three otherwise identical
+routes and times whole requests at the ASGI level (no network, no
+database):
+
+* model:         MomentResponse(**doc) per document, then FastAPI validates
+                 the page against response_model and encodes it (the old path);
+* model+orjson:  the same with FastJSONResponse as the response class;
+* trusted:       trusted_documents() picks the fields and FastJSONResponse
+                 encodes them, skipping Pydantic.
+
+    python -m scripts.bench_serialization --moments 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from fastapi import FastAPI
+
+from backend.models import MomentPage, MomentResponse
+from backend.serialization import FastJSONResponse, trusted_documents
+
+def make_documents(count):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": "65f0c0ffee0000000000beef",
+            "content": f"Spoke up in standup about the deadline ({i})",
+            "virtue_id": "courage",
+            "feedback": "It takes strength to face challenges. You showed great courage!",
+            "timestamp": start + timedelta(minutes=i, microseconds=i * 1000 % 1000000),
+        }
+        for i in range(count)
+    ]
+
+def make_app(documents):
+    app = FastAPI()
+
+    @app.get("/model", response_model=MomentPage)
+    async def model_path():
+        return MomentPage(items=[MomentResponse(**doc) for doc in documents], next_cursor=None)
+
+    @app.get("/model-orjson", response_model=MomentPage, response_class=FastJSONResponse)
+    async def model_orjson_path():
+        return MomentPage(items=[MomentResponse(**doc) for doc in documents], next_cursor=None)
+
+    @app.get("/trusted", response_model=MomentPage)
+    async def trusted_path():
+        return FastJSONResponse({"items": trusted_documents(MomentResponse, documents), "next_cursor": None})
+
+    return app
+
+async def request(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("bench", 0), "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+async def run(args):
+    documents = make_documents(args.moments)
+    app = make_app(documents)
+    # The model paths must produce byte-identical output to the trusted one
+    bodies = {path: await request(app, path) for path in ("/model", "/model-orjson", "/trusted")}
+    assert bodies["/model"] == bodies["/trusted"], "trusted output differs from the model path"
+    assert bodies["/model-orjson"] == bodies["/trusted"], "orjson output differs from the model path"
+
+    print(f"{args.moments} moments per response, {len(bodies['/trusted']) / 1e6:.1f} MB, {args.repeat} requests each")
+    print(f"{'path':<14} {'median ms':>10} {'min ms':>10} {'speedup':>8}")
+    baseline = None
+    for name, path in (("model", "/model"), ("model+orjson", "/model-orjson"), ("trusted", "/trusted")):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await request(app, path)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"{name:<14} {median:>10.1f} {min(timings):>10.1f} {baseline / median:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moments", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
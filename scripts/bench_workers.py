@@ -0,0 +1,167 @@
+"""
+Throughput scaling of the production server from 1 to N uvicorn workers.
+
+For each worker count, starts ``backend/run.py --production --workers N`` on
+a local port, signs up a user, then hammers a few authenticated read
+endpoints from several load-generating processes for a fixed time and
+reports requests per second, latency percentiles and the speedup over one
+worker:
+
+    python -m scripts.bench_workers --workers 1 2 4 8 --duration 20
+
+By default the servers use the in-memory backend with claims-only
+authentication, so every worker can answer every request without a shared
+database and the numbers measure the web tier alone. ``--mongo`` keeps the
+configured MONGODB_URI instead. The load generators share the machine with
+the server; leave them a core or two (``--clients``) so they do not become
+the bottleneck.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from backend.run import available_cpus
+
+DEFAULT_PATHS = ["/api/v1/news", "/api/v1/dashboard/bootstrap"]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def start_server(workers: int, port: int, use_mongo: bool) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=".")
+    env.setdefault("JWT_SECRET", uuid.uuid4().hex * 2)
+    if not use_mongo:
+        env.update(STORAGE_BACKEND="memory", AUTH_CLAIMS_ONLY="true", CACHE_INVALIDATION_BUS="local")
+    return subprocess.Popen(
+        [sys.executable, "backend/run.py", "--production", "--workers", str(workers), "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Its own process group, so stopping it also stops its workers
+        start_new_session=True,
+    )
+
+def stop_server(server: subprocess.Popen):
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/healthz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+async def sign_up(base_url: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/api/v1/auth/signup", json={
+            "email": f"bench_workers_{uuid.uuid4().hex[:12]}@example.com",
+            "password": "benchpassword123",
+            "name": "Bench",
+        })
+        response.raise_for_status()
+        return response.json()["token"]
+
+async def generate_load(base_url, token, paths, concurrency, duration):
+    latencies, errors = [], 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(offset):
+            nonlocal errors
+            n = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[n % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.TransportError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+                n += 1
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return latencies, errors
+
+def load_process(args):
+    return asyncio.run(generate_load(*args))
+
+def measure(workers: int, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(workers, args.port, args.mongo)
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        token = asyncio.run(sign_up(base_url))
+        job = (base_url, token, args.path, args.concurrency, args.duration)
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            # Warm up every worker's caches and pool before measuring
+            pool.map(load_process, [(base_url, token, args.path, args.concurrency, 2.0)] * args.clients)
+            started = time.perf_counter()
+            results = pool.map(load_process, [job] * args.clients)
+            elapsed = time.perf_counter() - started
+    finally:
+        stop_server(server)
+
+    latencies = [latency for result, _ in results for latency in result]
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+def main(args):
+    print(f"{available_cpus()} CPUs, {args.clients} load processes x {args.concurrency} connections, {args.duration}s per run")
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    runs = []
+    for workers in args.workers:
+        run = measure(workers, args)
+        runs.append(run)
+        speedup = run["rps"] / runs[0]["rps"] if runs[0]["rps"] else 0.0
+        print(
+            f"{workers:>7} {run['rps']:>10.1f} {speedup:>7.2f}x {run['p50_ms']:>8.1f} "
+            f"{run['p99_ms']:>8.1f} {run['errors']:>7}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpus": available_cpus(), "paths": args.path, "runs": runs}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    cpus = available_cpus()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument("--path", action="append", help=f"endpoint to load, repeatable (default {DEFAULT_PATHS})")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=max(1, cpus // 2), help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per load process")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mongo", action="store_true", help="use the configured MongoDB instead of the memory backend")
+    parser.add_argument("--output", help="write the JSON results here")
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+    main(args)
@@ -0,0 +1,89 @@
+"""
+Counts MongoDB operations and measures latency for each write endpoint.
+
+Boots the app in-process (no server needed) against the database configured
+by MONGODB_URI and records every command the driver sends while serving each
+request. Run it on two commits to compare:
+
+    python -m scripts.bench_write_paths --iterations 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+
+from pymongo import monitoring
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# Must be registered before the Motor client is created
+counter = CommandCounter()
+monitoring.register(counter)
+
+import httpx
+
+from backend.main import app
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def measure(results, name, request):
+    counter.commands.clear()
+    start = time.perf_counter()
+    response = await request()
+    elapsed = (time.perf_counter() - start) * 1000
+    response.raise_for_status()
+    results[name]["latency"].append(elapsed)
+    results[name]["ops"].append(len(counter.commands))
+    return response
+
+async def run(args):
+    results = defaultdict(lambda: {"latency": [], "ops": []})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+        for _ in range(args.iterations):
+            email = f"bench_write_{uuid.uuid4().hex[:8]}@example.com"
+            response = await measure(results, "POST /auth/signup", lambda: client.post(
+                "/auth/signup", json={"email": email, "password": "benchpassword123", "name": "Bench"}
+            ))
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+            await measure(results, "POST /assessment", lambda: client.post(
+                "/assessment", headers=headers, json={"answers": {f"q{i}": 4 for i in range(1, 11)}}
+            ))
+            await measure(results, "POST /goals", lambda: client.post(
+                "/goals", headers=headers,
+                json={"priority_virtues": ["courage", "empathy"], "innovation_goal": "Ship it"}
+            ))
+            await measure(results, "POST /moments", lambda: client.post(
+                "/moments", headers=headers, json={"content": "Spoke up in standup", "virtue_id": "courage"}
+            ))
+            await measure(results, "GET /challenges (cold)", lambda: client.get(
+                "/challenges", headers=headers
+            ))
+
+    print(f"{'endpoint':<26} {'ops/req':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, samples in results.items():
+        ops = sum(samples["ops"]) / len(samples["ops"])
+        print(
+            f"{name:<26} {ops:>8.1f} "
+            f"{percentile(samples['latency'], 50):>8.1f} {percentile(samples['latency'], 95):>8.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,273 @@
+"""
+Bulk synthetic dataset for scale testing.
+
+Creates N users with everything the app would have accumulated for them
+over a span of years: assessment retakes with drifting scores, goal
+changes, moments and weekly challenges, plus the matching weekly rollups so
+dashboards read the same as for real users. Generated against the database
+configured by MONGODB_URI:
+
+    python -m scripts.generate_dataset --users 100000 --moments-per-user 200 --years 2
+
+Moments follow a per-user virtue preference (biased towards the user's
+priority virtues), a working-hours time-of-day curve shifted by the user's
+UTC offset, quieter weekends, and a long-tailed number of moments per user.
+Every user shares one password (``--password``) hashed once up front.
+
+Documents are written with unordered ``insert_many`` batches, several in
+flight at once, and the run reports inserted documents per second per
+collection. _ids are derived from each document's creation time so "latest"
+queries sorting on _id see the generated history in order.
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from bson import ObjectId
+
+from backend.auth import get_password_hash
+from backend.database import connect
+from backend.rollups import ROLLUPS_COLLECTION, week_start_of
+from backend.routers.external import VIRTUE_NAMES, generate_challenges_for_virtues
+from backend.routers.moments import VIRTUE_FEEDBACK
+
+VIRTUES = list(VIRTUE_NAMES)
+
+# Relative moment volume per UTC hour for a user at UTC+0: a morning and an
+# after-lunch peak during work, a smaller evening one for reflection
+HOUR_WEIGHTS = [
+    0.2, 0.1, 0.1, 0.1, 0.1, 0.3, 0.8, 1.5, 2.5, 3.0, 2.8, 2.2,
+    1.8, 2.4, 2.8, 2.6, 2.2, 1.6, 1.4, 1.8, 2.0, 1.5, 0.9, 0.4,
+]
+# Monday .. Sunday
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.0, 0.9, 0.45, 0.4]
+UTC_OFFSETS = list(range(-8, 10))
+
+MOMENT_TEMPLATES = [
+    "Practiced {virtue} during the sprint planning meeting",
+    "Showed {virtue} when a customer escalation landed on my desk",
+    "Used {virtue} while pairing with a colleague on a hard problem",
+    "Noticed a chance for {virtue} in a code review and took it",
+    "Brought {virtue} to a difficult conversation with my manager",
+    "Leaned on {virtue} after an experiment failed",
+]
+GOAL_TEMPLATES = [
+    "Lead an innovation project end to end",
+    "Pitch a new product idea to leadership",
+    "Mentor a junior colleague through their first launch",
+    "Ship a prototype that changes how my team works",
+]
+
+def object_id_at(moment: datetime) -> ObjectId:
+    # Timestamp prefix as in a server-generated id, random remainder for uniqueness
+    return ObjectId(struct.pack(">I", int(moment.timestamp())) + os.urandom(8))
+
+class BatchWriter:
+    """Buffers documents per collection and keeps a few insert_many calls in flight."""
+
+    def __init__(self, db, batch_size: int, concurrency: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = defaultdict(list)
+        self.inserted = defaultdict(int)
+        self.slots = asyncio.Semaphore(concurrency)
+        self.pending = set()
+
+    async def add(self, collection: str, document: dict):
+        buffer = self.buffers[collection]
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            await self.flush(collection)
+
+    async def flush(self, collection: str):
+        documents = self.buffers.pop(collection, [])
+        if not documents:
+            return
+        await self.slots.acquire()
+        task = asyncio.create_task(self._insert(collection, documents))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _insert(self, collection: str, documents: list):
+        try:
+            await self.db[collection].insert_many(documents, ordered=False)
+            self.inserted[collection] += len(documents)
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        for collection in list(self.buffers):
+            await self.flush(collection)
+        if self.pending:
+            await asyncio.gather(*self.pending)
+
+def user_profile(rng: random.Random, priority_virtues):
+    # Gamma draws give a Dirichlet-style preference; priority virtues get a boost
+    weights = [rng.gammavariate(0.8, 1.0) * (3.0 if v in priority_virtues else 1.0) for v in VIRTUES]
+    offset = rng.choice(UTC_OFFSETS)
+    hours = [HOUR_WEIGHTS[(hour + offset) % 24] for hour in range(24)]
+    return list(accumulate(weights)), list(accumulate(hours))
+
+def scores_at(rng: random.Random, base_scores, progress: float):
+    # Scores drift upward as the user keeps practicing, with some noise
+    return [
+        {"virtueId": virtue, "score": float(min(5, max(1, round(base + progress * rng.uniform(0, 1.5) + rng.gauss(0, 0.3)))))}
+        for virtue, base in base_scores.items()
+    ]
+
+async def generate_user(rng: random.Random, writer: BatchWriter, index: int, args, password_hash: str, now: datetime):
+    span_days = max(1, int(args.years * 365))
+    joined = now - timedelta(days=rng.randrange(span_days), seconds=rng.randrange(86400))
+    active_days = max(1, (now - joined).days)
+    user_id = object_id_at(joined)
+    uid = str(user_id)
+    rollups = defaultdict(lambda: {
+        "moment_count": 0, "moments": defaultdict(int),
+        "assessment_count": 0, "score_sums": defaultdict(float), "score_counts": defaultdict(int),
+    })
+
+    await writer.add("users", {
+        "_id": user_id,
+        "email": f"{args.prefix}{index}@example.com",
+        "hashed_password": password_hash,
+        "name": f"Synthetic User {index}",
+        "created_at": joined,
+    })
+
+    # 1. Goals: a first goal at signup, then an occasional change of focus
+    goal_times = [joined] + sorted(
+        joined + timedelta(days=rng.randrange(active_days)) for _ in range(rng.choice([0, 0, 1, 1, 2]))
+    )
+    goals = []
+    for created_at in goal_times:
+        priority = rng.sample(VIRTUES, rng.randint(1, 3))
+        goals.append((created_at, priority))
+        await writer.add("goals", {
+            "_id": object_id_at(created_at),
+            "user_id": uid,
+            "priority_virtues": priority,
+            "innovation_goal": rng.choice(GOAL_TEMPLATES),
+            "created_at": created_at,
+        })
+
+    # 2. Assessments: at signup, then retaken roughly every quarter
+    base_scores = {virtue: rng.randint(1, 4) for virtue in VIRTUES}
+    retakes = int(active_days / 90 * rng.uniform(0.3, 1.0))
+    for n in range(retakes + 1):
+        created_at = min(now, joined + timedelta(days=min(active_days - 1, n * 90 + rng.randrange(14)), hours=rng.randrange(24)))
+        scores = scores_at(rng, base_scores, (created_at - joined).days / span_days)
+        await writer.add("assessments", {
+            "_id": object_id_at(created_at),
+            "user_id": uid,
+            "scores": scores,
+            "narrative_profile": "You demonstrate strong potential in resilience and integrity. Your growth mindset is a key asset.",
+            "created_at": created_at,
+        })
+        rollup = rollups[week_start_of(created_at)]
+        rollup["assessment_count"] += 1
+        for score in scores:
+            rollup["score_sums"][score["virtueId"]] += score["score"]
+            rollup["score_counts"][score["virtueId"]] += 1
+
+    # 3. Moments: a long-tailed count spread over the user's active days
+    virtue_weights, hour_weights = user_profile(rng, goals[-1][1])
+    count = int(min(args.moments_per_user * 20, rng.lognormvariate(math.log(args.moments_per_user) - 0.5, 1.0)))
+    count = int(count * active_days / span_days) if args.scale_by_tenure else count
+    start_day = joined.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_weights = list(accumulate(WEEKDAY_WEIGHTS[(start_day + timedelta(days=d)).weekday()] for d in range(active_days)))
+    days = rng.choices(range(active_days), cum_weights=day_weights, k=count)
+    hours = rng.choices(range(24), cum_weights=hour_weights, k=count)
+    virtues = rng.choices(VIRTUES, cum_weights=virtue_weights, k=count)
+    for day, hour, virtue in zip(days, hours, virtues):
+        timestamp = start_day + timedelta(days=day, hours=hour, seconds=rng.randrange(3600))
+        if timestamp > now:
+            timestamp = now - timedelta(seconds=rng.randrange(3600))
+        await writer.add("moments", {
+            "_id": object_id_at(timestamp),
+            "user_id": uid,
+            "content": rng.choice(MOMENT_TEMPLATES).format(virtue=VIRTUE_NAMES[virtue].lower()),
+            "virtue_id": virtue,
+            "feedback": VIRTUE_FEEDBACK.get(virtue, f"Great job practicing {virtue}!"),
+            "timestamp": timestamp,
+        })
+        rollup = rollups[week_start_of(timestamp)]
+        rollup["moment_count"] += 1
+        rollup["moments"][virtue] += 1
+
+    # 4. Challenges for every week since joining, from the goal current that week
+    week = week_start_of(joined)
+    goal_index = 0
+    while week <= now:
+        while goal_index + 1 < len(goals) and goals[goal_index + 1][0] <= week:
+            goal_index += 1
+        for challenge in generate_challenges_for_virtues(goals[goal_index][1], uid, week):
+            if week < week_start_of(now) and rng.random() < args.completion_rate:
+                challenge["status"] = "completed"
+            challenge["_id"] = object_id_at(week)
+            await writer.add("challenges", challenge)
+        week += timedelta(days=7)
+
+    # 5. Rollups, since these writes bypass the endpoints that maintain them
+    for week_start, rollup in rollups.items():
+        await writer.add(ROLLUPS_COLLECTION, {
+            "user_id": uid,
+            "week_start": week_start,
+            "moment_count": rollup["moment_count"],
+            "moments": dict(rollup["moments"]),
+            "assessment_count": rollup["assessment_count"],
+            "score_sums": dict(rollup["score_sums"]),
+            "score_counts": dict(rollup["score_counts"]),
+        })
+
+def report(writer: BatchWriter, started: float, users_done: int, total_users: int):
+    elapsed = time.perf_counter() - started
+    inserted = sum(writer.inserted.values())
+    print(
+        f"{users_done}/{total_users} users, {inserted} documents in {elapsed:.1f}s "
+        f"({inserted / elapsed:,.0f} docs/s, {writer.inserted['moments'] / elapsed:,.0f} moments/s)"
+    )
+
+async def run(args):
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    print("Hashing the shared password...")
+    password_hash = get_password_hash(args.password)
+
+    writer = BatchWriter(connect(), args.batch_size, args.concurrency)
+    started = time.perf_counter()
+    last_report = started
+    for index in range(args.users):
+        await generate_user(rng, writer, index, args, password_hash, now)
+        if time.perf_counter() - last_report >= args.report_every:
+            report(writer, started, index + 1, args.users)
+            last_report = time.perf_counter()
+    await writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.1f}s (users share the password {args.password!r}, emails {args.prefix}<n>@example.com)")
+    for collection, inserted in sorted(writer.inserted.items()):
+        print(f"  {collection:<24} {inserted:>12,} docs {inserted / elapsed:>12,.0f} docs/s")
+    report(writer, started, args.users, args.users)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--moments-per-user", type=int, default=200, help="mean moments per user; long-tailed, capped at 20x")
+    parser.add_argument("--years", type=float, default=2.0, help="how far back signups go")
+    parser.add_argument("--scale-by-tenure", action="store_true", help="give recent signups proportionally fewer moments")
+    parser.add_argument("--completion-rate", type=float, default=0.4, help="share of past challenges marked completed")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many calls in flight")
+    parser.add_argument("--prefix", default=f"synthetic-{uuid.uuid4().hex[:6]}-", help="email prefix, unique per run by default")
+    parser.add_argument("--password", default="synthetic-password")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    asyncio.run(run(parser.parse_args()))